@@ -0,0 +1,166 @@
+"""
+Сравнение пропускной способности под WSGI и ASGI.
+
+Запуск: python -m benchmarks.asgi_vs_wsgi
+
+Нужны gunicorn и uvicorn (pip install gunicorn uvicorn). Скрипт
+заполняет локальную базу SQLite, по очереди поднимает gunicorn
+с синхронными представлениями и uvicorn с асинхронными
+(NEWS_ASYNC_VIEWS) и нагружает главную страницу и страницу новости.
+Результат - запросов в секунду и задержки p50/p99 в JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SETTINGS = 'benchmarks.settings'
+HOST = '127.0.0.1'
+SERVERS = {
+    'wsgi': (
+        'gunicorn', 'yanews.wsgi:application', '--workers', '1',
+        '--threads', '8', '--worker-class', 'gthread',
+        '--log-level', 'warning',
+    ),
+    'asgi': (
+        'uvicorn', 'yanews.asgi:application', '--workers', '1',
+        '--log-level', 'warning',
+    ),
+}
+
+
+def prepare(news_count):
+    """Заполняем базу и выбираем новости для нагрузки."""
+    import django
+    django.setup()
+    from benchmarks.seed import seed
+    from news.models import News
+
+    seed(news=news_count, comments=news_count * 50, users=news_count)
+    return list(News.objects.values_list('pk', flat=True)[:news_count])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Сервер не поднялся на порту {port}.')
+
+
+async def fetch(reader, writer, path):
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    headers = await reader.readuntil(b'\r\n\r\n')
+    status = int(headers.split(b' ', 2)[1])
+    length = 0
+    for line in headers.split(b'\r\n'):
+        name, _, value = line.partition(b':')
+        if name.lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def worker(port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    index = 0
+    try:
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            status = await fetch(reader, writer, path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def load(port, paths, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(*(
+        worker(port, paths, deadline, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+
+    def percentile(share):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * share))]
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(0.50) * 1000, 2),
+        'p99_ms': round(percentile(0.99) * 1000, 2),
+    }
+
+
+def run_server(mode, port):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=SETTINGS,
+        NEWS_ASYNC_VIEWS='1' if mode == 'asgi' else '0',
+    )
+    command, *args = SERVERS[mode]
+    bind = (
+        ['--bind', f'{HOST}:{port}'] if mode == 'wsgi'
+        else ['--host', HOST, '--port', str(port)]
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', command, *args, *bind], env=env
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--news', type=int, default=100)
+    options = parser.parse_args()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS)
+    news_ids = prepare(options.news)
+    scenarios = {
+        'home': ['/'],
+        'detail': [f'/news/{pk}/' for pk in news_ids],
+    }
+    results = {}
+    for mode in SERVERS:
+        port = free_port()
+        server = run_server(mode, port)
+        try:
+            wait_for_port(port)
+            results[mode] = {
+                name: asyncio.run(load(
+                    port, paths, options.concurrency, options.duration
+                ))
+                for name, paths in scenarios.items()
+            }
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
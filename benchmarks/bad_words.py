@@ -0,0 +1,67 @@
+"""
+Сравнение матчеров запрещённых слов.
+
+Запуск: python -m benchmarks.bad_words
+
+Список из 10 000 случайных слов проверяется на комментариях
+от 100 до 400 КБ. Время RegexMatcher растёт линейно с длиной
+текста и почти не зависит от размера списка, в отличие от
+SubstringMatcher.
+"""
+import random
+import timeit
+
+from news.moderation import RegexMatcher, SubstringMatcher
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+WORDS_COUNT = 10_000
+TEXT_SIZES = (100_000, 200_000, 400_000)
+REPEAT = 7
+
+
+def random_word(rng, min_length=4, max_length=12):
+    return ''.join(
+        rng.choice(ALPHABET)
+        for _ in range(rng.randint(min_length, max_length))
+    )
+
+
+def random_text(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = random_word(rng, 2, 10)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def measure(matcher, text):
+    return min(timeit.repeat(
+        lambda: matcher.search(text), number=1, repeat=REPEAT
+    ))
+
+
+def main():
+    rng = random.Random(0)
+    words = [random_word(rng) for _ in range(WORDS_COUNT)]
+    # Слова из списка не встречаются в тексте: худший случай для поиска.
+    texts = {size: random_text(rng, size) for size in TEXT_SIZES}
+    for matcher_class in (RegexMatcher, SubstringMatcher):
+        build_time = min(timeit.repeat(
+            lambda: matcher_class(words), number=1, repeat=REPEAT
+        ))
+        matcher = matcher_class(words)
+        print(f'{matcher_class.__name__}: сборка {build_time * 1000:.1f} мс')
+        base = None
+        for size, text in texts.items():
+            elapsed = measure(matcher, text)
+            base = base or elapsed / size
+            print(
+                f'  {size // 1000:>4} КБ: {elapsed * 1000:9.2f} мс, '
+                f'{elapsed / size / base:.2f}x на символ'
+            )
+
+
+if __name__ == '__main__':
+    main()
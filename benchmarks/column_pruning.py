@@ -0,0 +1,120 @@
+"""
+Объём данных, который загружают список новостей и страница новости.
+
+Запуск: python -m benchmarks.column_pruning
+
+Скрипт создаёт во временном каталоге базу с длинными статьями
+и обсуждаемой новостью и сравнивает запросы, загружающие все
+столбцы, с запросами представлений, которые берут только выводимые
+поля. Для каждого запроса измеряются байты в строках результата
+и пик памяти при создании объектов. Результат - JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+
+def value_size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value.encode() if isinstance(value, str) else value)
+    return 8
+
+
+def measure(queryset):
+    """Байты в строках результата и пик памяти при загрузке объектов."""
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    tracemalloc.start()
+    objects = list(queryset.all())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'rows': len(objects),
+        'row_bytes': sum(value_size(value) for row in rows for value in row),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(article_kib, news_count, comments):
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.core.management import call_command
+
+    from news.models import Comment, News
+    from news.pagination import comment_page_queryset
+    from news.rendering import make_excerpt, render_text
+    from news.views import NewsDetail, NewsList
+
+    call_command('migrate', verbosity=0)
+    text = ('Длинная статья. ' * (article_kib * 64))[:article_kib * 1024]
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text=text, excerpt=make_excerpt(text))
+        for index in range(news_count)
+    )
+    hot_news = News.objects.first()
+    User = get_user_model()
+    authors = User.objects.bulk_create(
+        User(
+            username=f'user{index}', email=f'user{index}@example.com',
+            password=make_password(None),
+        )
+        for index in range(100)
+    )
+    comment_text = 'Комментарий к статье. ' * 10
+    Comment.objects.bulk_create(
+        Comment(
+            news=hot_news, author=authors[index % len(authors)],
+            text=comment_text, text_html=render_text(comment_text),
+        )
+        for index in range(comments)
+    )
+    page_size = settings.COMMENTS_COUNT_ON_PAGE + 1
+    cases = {
+        'home': (
+            News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE],
+            NewsList().get_queryset(),
+        ),
+        'detail': (
+            News.objects.filter(pk=hot_news.pk),
+            NewsDetail().get_queryset().filter(pk=hot_news.pk),
+        ),
+        'comments': (
+            Comment.objects.filter(news=hot_news).select_related(
+                'author'
+            ).order_by('created', 'pk')[:page_size],
+            comment_page_queryset(hot_news.pk),
+        ),
+    }
+    results = {}
+    for name, (full, pruned) in cases.items():
+        results[name] = {'full': measure(full), 'pruned': measure(pruned)}
+        print(name, results[name], file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--article-kib', type=int, default=64)
+    parser.add_argument('--news', type=int, default=50)
+    parser.add_argument('--comments', type=int, default=1000)
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DB'] = os.path.join(directory, 'columns.sqlite3')
+        results = run(options.article_kib, options.news, options.comments)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
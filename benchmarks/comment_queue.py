@@ -0,0 +1,118 @@
+"""
+Синхронная запись комментариев против отложенной через очередь.
+
+Запуск: python -m benchmarks.comment_queue
+
+Скрипт создаёт пустую базу во временном каталоге с профилем
+SQLITE_PRODUCTION, и параллельные клиенты в потоках отправляют
+комментарии в форму на странице новости: сначала с синхронной
+записью, затем с COMMENT_WRITE_BEHIND. Для очереди отдельно
+замеряется перенос комментариев командой flush_comment_queue.
+Результат - запросов в секунду и задержки p50/p99 в JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+os.environ['SQLITE_PRODUCTION'] = '1'
+
+
+def post_comments(client, url, count):
+    """Отправляем комментарии и возвращаем задержки запросов."""
+    from django.db import connection
+
+    latencies = []
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = client.post(url, {'text': 'Комментарий под нагрузкой'})
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 302, response.status_code
+    finally:
+        connection.close()
+    return latencies
+
+
+def measure(clients, url, posts):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(len(clients)) as executor:
+        results = executor.map(
+            post_comments, clients, [url] * len(clients),
+            [posts] * len(clients),
+        )
+        latencies = sorted(
+            latency for result in results for latency in result
+        )
+    seconds = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'seconds': round(seconds, 3),
+        'requests_per_second': round(len(latencies) / seconds, 1),
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+def run(writers, posts):
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from news.models import Comment, News
+    from news.queue import flush_comment_queue
+
+    call_command('migrate', verbosity=0)
+    clients = []
+    for index in range(writers):
+        client = Client()
+        client.force_login(get_user_model().objects.create(
+            username=f'Писатель {index}'
+        ))
+        clients.append(client)
+    results = {}
+    for mode, write_behind in (('sync', False), ('write_behind', True)):
+        news = News.objects.create(title=mode, text='Текст')
+        url = reverse('news:detail', args=(news.pk,))
+        connection.close()
+        with override_settings(COMMENT_WRITE_BEHIND=write_behind):
+            results[mode] = measure(clients, url, posts)
+        print(mode, results[mode], file=sys.stderr)
+    started = time.perf_counter()
+    flushed = 0
+    while batch := flush_comment_queue(settings.COMMENT_QUEUE_BATCH_SIZE):
+        flushed += batch
+    seconds = time.perf_counter() - started
+    results['flush'] = {
+        'comments': flushed,
+        'seconds': round(seconds, 3),
+        'comments_per_second': round(flushed / seconds, 1),
+    }
+    assert Comment.objects.count() == writers * posts * 2
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--posts', type=int, default=50)
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DB'] = os.path.join(directory, 'queue.sqlite3')
+        results = run(options.writers, options.posts)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
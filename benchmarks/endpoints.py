@@ -0,0 +1,169 @@
+"""
+Замеры страниц новостей и операций с комментариями.
+
+Запуск: python -m benchmarks.endpoints --output results.json
+
+База для замеров (BENCH_DB, по умолчанию bench.sqlite3) заполняется
+один раз: 10 000 новостей, 1 000 000 комментариев, 50 000
+пользователей; объёмы меняются параметрами. Для каждого сценария
+измеряются задержки, число SQL-запросов и пик выделенной памяти.
+Результат - JSON с хешем коммита, чтобы сравнивать коммиты между собой.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from benchmarks.seed import VOLUMES, seed  # noqa: E402
+from news.models import Comment, News  # noqa: E402
+
+
+class Scenario:
+    """Запрос, который повторяется и замеряется."""
+
+    def __init__(self, name, request, prepare=None):
+        self.name = name
+        self.request = request
+        self.prepare = prepare or (lambda iteration: None)
+
+
+def build_scenarios(iterations):
+    user = get_user_model().objects.order_by('pk').first()
+    client = Client()
+    client.force_login(user)
+    anonymous = Client()
+    # Самая обсуждаемая новость - худший случай для страницы новости.
+    hot_news = News.objects.order_by('-comment_count').first()
+    detail_url = reverse('news:detail', args=(hot_news.pk,))
+    own_comments = Comment.objects.bulk_create(
+        Comment(news=hot_news, author=user, text='Комментарий для замеров')
+        for _ in range(iterations * 2)
+    )
+    to_edit = own_comments[:iterations]
+    to_delete = own_comments[iterations:]
+    return [
+        Scenario(
+            'home_cold',
+            lambda i: anonymous.get(reverse('news:home')),
+            prepare=lambda i: cache.clear(),
+        ),
+        Scenario('home', lambda i: anonymous.get(reverse('news:home'))),
+        Scenario('detail', lambda i: anonymous.get(detail_url)),
+        Scenario(
+            'comment_post',
+            lambda i: client.post(detail_url, {'text': f'Комментарий {i}'}),
+        ),
+        Scenario(
+            'comment_edit',
+            lambda i: client.post(
+                reverse('news:edit', args=(to_edit[i].pk,)),
+                {'text': f'Изменённый комментарий {i}'},
+            ),
+        ),
+        Scenario(
+            'comment_delete',
+            lambda i: client.post(
+                reverse('news:delete', args=(to_delete[i].pk,))
+            ),
+        ),
+    ]
+
+
+def measure(scenario, iterations, warmup):
+    """Каждый запрос получает свой номер, чтобы не задевать чужие данные."""
+    for iteration in range(warmup):
+        scenario.prepare(iteration)
+        scenario.request(iteration)
+    latencies = []
+    queries = []
+    statuses = set()
+    for iteration in range(warmup, warmup + iterations):
+        scenario.prepare(iteration)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = scenario.request(iteration)
+            latencies.append(time.perf_counter() - started)
+        queries.append(len(context.captured_queries))
+        statuses.add(response.status_code)
+    # Память замеряется отдельно: tracemalloc замедляет запросы.
+    iteration = warmup + iterations
+    scenario.prepare(iteration)
+    tracemalloc.start()
+    scenario.request(iteration)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'statuses': sorted(statuses),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            * 1000, 3
+        ),
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--news', type=int, default=VOLUMES['news'])
+    parser.add_argument('--comments', type=int, default=VOLUMES['comments'])
+    parser.add_argument('--users', type=int, default=VOLUMES['users'])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    options = parser.parse_args()
+    volumes = seed(options.news, options.comments, options.users)
+    scenarios = build_scenarios(options.iterations + options.warmup + 1)
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = measure(
+            scenario, options.iterations, options.warmup
+        )
+        print(scenario.name, results[scenario.name], file=sys.stderr)
+    report = json.dumps({
+        'commit': git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(),
+        'volumes': volumes,
+        'results': results,
+    }, indent=2)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as output:
+            output.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Заполнение базы для нагрузочных тестов.
+
+Все строки создаются порциями через bulk_create, как в фикстуре
+news_to_pagginate, только в реалистичных объёмах. Комментарии
+распределены неравномерно: у свежих новостей их намного больше.
+"""
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from news.dates import rebuild_day_counts
+from news.models import Comment, News
+from news.rendering import make_excerpt, render_text
+
+BATCH_SIZE = 5000
+VOLUMES = {'news': 10_000, 'comments': 1_000_000, 'users': 50_000}
+
+
+def batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def bulk_create(model, objects):
+    for batch in batched(objects):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+
+
+def current_volumes():
+    return {
+        'news': News.objects.count(),
+        'comments': Comment.objects.count(),
+        'users': get_user_model().objects.count(),
+    }
+
+
+def seed(news=VOLUMES['news'], comments=VOLUMES['comments'],
+         users=VOLUMES['users'], seed_value=0):
+    """Создаём данные, если база пуста, и возвращаем их объёмы."""
+    call_command('migrate', verbosity=0)
+    if News.objects.exists():
+        return current_volumes()
+    rng = random.Random(seed_value)
+    today = timezone.now().date()
+    password = make_password(None)
+    User = get_user_model()
+    bulk_create(User, (
+        User(username=f'user{index}', password=password)
+        for index in range(users)
+    ))
+    bulk_create(News, (
+        News(
+            title=f'Новость {index}',
+            text=text,
+            excerpt=make_excerpt(text),
+            date=today - timedelta(days=index // 10),
+        )
+        for index, text in enumerate(
+            'Текст новости. ' * rng.randint(20, 400) for _ in range(news)
+        )
+    ))
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    # Чем новее новость, тем больше у неё комментариев.
+    news_ids = list(News.objects.order_by('-date').values_list(
+        'pk', flat=True
+    ))
+    weights = [1 / (rank + 1) for rank in range(len(news_ids))]
+    now = timezone.now()
+    bulk_create(Comment, (
+        Comment(
+            news_id=news_id,
+            author_id=author_id,
+            text=text,
+            text_html=render_text(text),
+            created=now - timedelta(seconds=comments - index),
+        )
+        for index, news_id in enumerate(
+            rng.choices(news_ids, weights, k=comments)
+        )
+        for author_id, text in [(
+            rng.choice(user_ids), f'Комментарий {index}. ' * rng.randint(1, 20)
+        )]
+    ))
+    News.objects.recount_comments()
+    rebuild_day_counts()
+    return current_volumes()
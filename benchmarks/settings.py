@@ -0,0 +1,23 @@
+"""Настройки проекта для нагрузочных тестов."""
+import os
+
+from yanews.settings import *  # noqa: F401, F403
+from yanews.settings import BASE_DIR, SQLITE_PRODUCTION
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCH_DB', BASE_DIR / 'bench.sqlite3'),
+    }
+}
+if os.environ.get('SQLITE_PRODUCTION') == '1':
+    DATABASES['default'].update(SQLITE_PRODUCTION)
+
+NEWS_ASYNC_VIEWS = os.environ.get('NEWS_ASYNC_VIEWS') == '1'
+
+# Все клиенты нагрузки приходят с одного адреса.
+COMMENT_RATE_LIMIT = None
@@ -0,0 +1,118 @@
+"""
+Нагрузка SQLite параллельными писателями комментариев.
+
+Запуск: python -m benchmarks.sqlite_writers
+
+Для каждого профиля базы (стандартные настройки и SQLITE_PRODUCTION)
+скрипт создаёт пустую базу во временном каталоге и в отдельном процессе
+запускает писателей в потоках. Каждый писатель в транзакции читает
+новость и создаёт комментарий: вставка, обновление счётчика, сброс кеша.
+Результат - записей в секунду и число ошибок "database is locked" в JSON.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SETTINGS = 'benchmarks.settings'
+PROFILES = {'default': '0', 'production': '1'}
+
+
+def write_comments(news_id, author_id, count):
+    """Создаём комментарии, считаем успешные записи и блокировки."""
+    from django.db import OperationalError, connection, transaction
+
+    from news.models import Comment, News
+
+    written = locked = 0
+    try:
+        for _ in range(count):
+            try:
+                with transaction.atomic():
+                    news = News.objects.get(pk=news_id)
+                    Comment.objects.create(
+                        news=news, author_id=author_id,
+                        text='Комментарий под нагрузкой',
+                    )
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                locked += 1
+            else:
+                written += 1
+    finally:
+        connection.close()
+    return written, locked
+
+
+def run_writers(writers, writes):
+    """Процесс одного профиля: готовим базу и запускаем писателей."""
+    import django
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+
+    from news.models import News
+
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='Писатель')
+    news = News.objects.create(title='Новость', text='Текст')
+    connection.close()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(writers) as executor:
+        results = list(executor.map(
+            write_comments,
+            [news.pk] * writers, [author.pk] * writers, [writes] * writers,
+        ))
+    seconds = time.perf_counter() - started
+    written = sum(result[0] for result in results)
+    news.refresh_from_db()
+    print(json.dumps({
+        'writers': writers,
+        'written': written,
+        'locked': sum(result[1] for result in results),
+        'seconds': round(seconds, 3),
+        'writes_per_second': round(written / seconds, 1),
+        'comment_count': news.comment_count,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--writes', type=int, default=200)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.profile:
+        run_writers(options.writers, options.writes)
+        return
+    results = {}
+    for profile, enabled in PROFILES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            output = subprocess.run(
+                [
+                    sys.executable, '-m', 'benchmarks.sqlite_writers',
+                    '--profile', profile,
+                    '--writers', str(options.writers),
+                    '--writes', str(options.writes),
+                ],
+                env={
+                    **os.environ,
+                    'DJANGO_SETTINGS_MODULE': SETTINGS,
+                    'BENCH_DB': os.path.join(directory, 'writers.sqlite3'),
+                    'SQLITE_PRODUCTION': enabled,
+                },
+                check=True, capture_output=True, text=True,
+            ).stdout
+        results[profile] = json.loads(output)
+        print(profile, results[profile], file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Отрисовка шаблонов страниц с холодным и прогретым кешем шаблонов.
+
+Запуск: python -m benchmarks.template_render
+
+Скрипт заполняет небольшую базу во временном каталоге, получает
+ответы представлений без отрисовки и замеряет только отрисовку
+шаблона: «холодная» - после сброса кеширующего загрузчика, как на
+первом запросе процесса, «тёплая» - после прогрева кеша шаблонов.
+Результат - медианы в миллисекундах в JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+
+def build_views():
+    """Имя страницы и функция, возвращающая неотрисованный ответ."""
+    from django.contrib.auth.models import AnonymousUser
+    from django.contrib.auth.views import LoginView
+    from django.test import RequestFactory
+    from django.urls import reverse
+
+    from news.models import News
+    from news.views import NewsDetailView, NewsList, NewsSearch
+
+    factory = RequestFactory()
+    hot_news = News.objects.order_by('-comment_count').first()
+
+    def view(view_class, url, **kwargs):
+        def respond():
+            request = factory.get(url)
+            request.user = AnonymousUser()
+            return view_class.as_view()(request, **kwargs)
+        return respond
+
+    return {
+        'home': view(NewsList, reverse('news:home')),
+        'detail': view(
+            NewsDetailView, reverse('news:detail', args=(hot_news.pk,)),
+            pk=hot_news.pk,
+        ),
+        'search': view(NewsSearch, reverse('news:search') + '?q=Текст'),
+        'login': view(LoginView, reverse('users:login')),
+    }
+
+
+def measure(respond, iterations, cold):
+    from django.core.cache import cache
+    from django.template import engines
+
+    from news.template_cache import warm_template_cache
+
+    loader = engines['django'].engine.template_loaders[0]
+    timings = []
+    for _ in range(iterations):
+        # Кеш фрагментов скрыл бы отрисовку главной страницы.
+        cache.clear()
+        if cold:
+            loader.reset()
+        else:
+            warm_template_cache()
+        response = respond()
+        started = time.perf_counter()
+        response.render()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=50)
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DB'] = os.path.join(directory, 'templates.sqlite3')
+        import django
+        django.setup()
+
+        from benchmarks.seed import seed
+
+        seed(news=100, comments=5000, users=100)
+        results = {}
+        for name, respond in build_views().items():
+            results[name] = {
+                'cold_ms': measure(respond, options.iterations, cold=True),
+                'warm_ms': measure(respond, options.iterations, cold=False),
+            }
+            print(name, results[name], file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search_index(using, **kwargs):
+    """Миграции могут пересоздать таблицы и удалить триггеры поиска."""
+    from .search import install_search_index
+    install_search_index(connections[using])
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .middleware import install_query_recorder
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(install_query_recorder)
@@ -0,0 +1,117 @@
+"""
+Архив старых новостей.
+
+Команда archive_news переносит новости старше заданного возраста
+вместе с комментариями в архивные таблицы (ArchivedNews,
+ArchivedComment), чтобы основные таблицы и их индексы оставались
+небольшими. Страница новости ищет новость в архиве, если её нет
+в основной таблице; архив доступен только для чтения.
+"""
+from functools import partial
+
+from django.db import connections, router, transaction
+
+from .dates import refresh_day_counts, skip_day_counts
+from .models import (
+    ArchivedComment, ArchivedNews, Comment, News, QueuedComment
+)
+from .routers import use_primary
+
+# Комментарии копируются порциями, чтобы не держать в памяти
+# все комментарии обсуждаемой новости.
+COMMENT_CHUNK_SIZE = 2000
+COMMENT_FIELDS = ('id', 'news_id', 'author_id', 'text', 'text_html', 'created')
+
+
+def archivable_news(before):
+    """Новости до даты before, у которых нет комментариев в очереди."""
+    return News.objects.filter(date__lt=before).exclude(
+        pk__in=QueuedComment.objects.values('news')
+    ).order_by('pk')
+
+
+def copy_comments(news_ids):
+    """Копируем комментарии новостей в архив, возвращаем их число."""
+    comments = Comment.objects.filter(news_id__in=news_ids).order_by(
+        'pk'
+    ).values_list(*COMMENT_FIELDS).iterator(chunk_size=COMMENT_CHUNK_SIZE)
+    copied = 0
+    chunk = []
+    for values in comments:
+        chunk.append(ArchivedComment(**dict(zip(COMMENT_FIELDS, values))))
+        if len(chunk) == COMMENT_CHUNK_SIZE:
+            ArchivedComment.objects.bulk_create(chunk)
+            copied += len(chunk)
+            chunk = []
+    ArchivedComment.objects.bulk_create(chunk)
+    return copied + len(chunk)
+
+
+def delete_comments(news_ids):
+    """
+    Удаляем комментарии новостей одним запросом.
+
+    Удаление через ORM отправило бы сигналы для каждого комментария:
+    счётчики и кеши новостей, которые сейчас удаляются, не нужны.
+    Триггеры поиска срабатывают как обычно.
+    """
+    using = router.db_for_write(Comment)
+    connection = connections[using]
+    placeholders = ', '.join(['%s'] * len(news_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(Comment._meta.db_table)}'
+            f' WHERE news_id IN ({placeholders})',
+            news_ids,
+        )
+
+
+def archive_batch(before, batch_size):
+    """
+    Переносим в архив пачку новостей до даты before с комментариями.
+
+    Копирование и удаление идут одной транзакцией: новость всегда
+    находится ровно в одной из таблиц. Новость удаляется через ORM,
+    поэтому её сигналы сбрасывают кеши, ленты и снимок страницы,
+    а счётчики рейтингов удаляются каскадом. Счётчики дней пачки
+    пересчитываются один раз после фиксации, а не для каждой новости.
+    Возвращаем число перенесённых новостей и комментариев.
+    """
+    token = use_primary.set(True)
+    skip_token = skip_day_counts.set(True)
+    try:
+        with transaction.atomic():
+            news = list(archivable_news(before)[:batch_size])
+            if not news:
+                return 0, 0
+            news_ids = [item.pk for item in news]
+            ArchivedNews.objects.bulk_create(
+                ArchivedNews(
+                    id=item.pk,
+                    title=item.title,
+                    text=item.text,
+                    date=item.date,
+                    comment_count=item.comment_count,
+                    excerpt=item.excerpt,
+                )
+                for item in news
+            )
+            comments = copy_comments(news_ids)
+            delete_comments(news_ids)
+            News.objects.filter(pk__in=news_ids).delete()
+            transaction.on_commit(partial(
+                refresh_day_counts, {item.date for item in news}
+            ))
+    finally:
+        skip_day_counts.reset(skip_token)
+        use_primary.reset(token)
+    return len(news), comments
+
+
+def archived_news(pk, fields):
+    """Архивная новость с полями fields или None."""
+    return ArchivedNews.objects.only(*fields).filter(pk=pk).first()
+
+
+async def aarchived_news(pk, fields):
+    return await ArchivedNews.objects.only(*fields).filter(pk=pk).afirst()
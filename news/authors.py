@@ -0,0 +1,85 @@
+"""
+Имена авторов комментариев без загрузки пользователей.
+
+Страница комментариев знает только author_id, а имена берутся
+из LRU-кеша процесса: после прогрева ни соединения с таблицей
+пользователей, ни объектов User. Сигналы сбрасывают имя
+при изменении или удалении пользователя, но только в том процессе,
+который его сохранил: в остальных процессах сервера имя живёт
+не дольше DISPLAY_NAME_CACHE_TIMEOUT секунд.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+
+class DisplayNameCache:
+    """Небольшой LRU-кеш имён пользователей по их id со сроком жизни."""
+
+    def __init__(self, size=10_000):
+        self.size = size
+        self.names = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, user_ids):
+        """Имена из кеша и id, которых в нём нет."""
+        found = {}
+        missing = set()
+        now = time.monotonic()
+        with self.lock:
+            for user_id in user_ids:
+                name, expires = self.names.get(user_id, (None, 0))
+                if expires > now:
+                    self.names.move_to_end(user_id)
+                    found[user_id] = name
+                else:
+                    missing.add(user_id)
+        return found, missing
+
+    def store(self, names):
+        expires = time.monotonic() + settings.DISPLAY_NAME_CACHE_TIMEOUT
+        with self.lock:
+            for user_id, name in names.items():
+                self.names[user_id] = name, expires
+                self.names.move_to_end(user_id)
+            while len(self.names) > self.size:
+                self.names.popitem(last=False)
+
+    def missing_names(self, missing):
+        User = get_user_model()
+        return User.objects.filter(pk__in=missing).values_list(
+            'pk', User.USERNAME_FIELD
+        )
+
+    def get_many(self, user_ids):
+        """Имена пользователей по id: недостающие одним запросом."""
+        found, missing = self.lookup(user_ids)
+        if missing:
+            names = dict(self.missing_names(missing))
+            self.store(names)
+            found.update(names)
+        return found
+
+    async def aget_many(self, user_ids):
+        found, missing = self.lookup(user_ids)
+        if missing:
+            names = {
+                pk: name async for pk, name in self.missing_names(missing)
+            }
+            self.store(names)
+            found.update(names)
+        return found
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.names.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.names.clear()
+
+
+display_names = DisplayNameCache()
@@ -0,0 +1,54 @@
+import time
+
+from django.core.cache import cache
+
+HOME_VERSION_KEY = 'news:home:version'
+NEWS_VERSION_KEY = 'news:{pk}:version'
+FEED_VERSION_KEY = 'news:feed:version'
+
+
+def get_version(key):
+    """
+    Версия закешированных данных - время их последнего изменения в нс.
+
+    Если версия пропала из кеша, она начинается заново с текущего
+    момента: это лишь сбрасывает зависящие от неё кеши.
+    """
+    return cache.get_or_set(key, time.time_ns, None)
+
+
+def bump_version(key):
+    cache.set(key, time.time_ns(), None)
+
+
+def get_home_version():
+    """Текущая версия списка новостей на главной странице."""
+    return get_version(HOME_VERSION_KEY)
+
+
+def bump_home_version():
+    """
+    Инвалидируем закешированный список новостей.
+
+    Старые фрагменты не удаляются, а просто перестают быть нужными:
+    ключ фрагмента содержит версию, и они истекают сами.
+    """
+    bump_version(HOME_VERSION_KEY)
+
+
+def get_news_version(pk):
+    """Версия страницы новости: меняется при любой правке её данных."""
+    return get_version(NEWS_VERSION_KEY.format(pk=pk))
+
+
+def bump_news_version(pk):
+    bump_version(NEWS_VERSION_KEY.format(pk=pk))
+
+
+def get_feed_version():
+    """Версия лент новостей: меняется только при записи новостей."""
+    return get_version(FEED_VERSION_KEY)
+
+
+def bump_feed_version():
+    bump_version(FEED_VERSION_KEY)
@@ -0,0 +1,77 @@
+import hashlib
+from datetime import datetime, time, timedelta, timezone
+
+from django.db.models import OuterRef, Subquery
+
+from .cache import get_home_version, get_news_version
+from .models import Comment, News
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def version_to_datetime(version):
+    return EPOCH + timedelta(microseconds=version // 1000)
+
+
+def make_etag(request, *parts):
+    """Страница зависит от пользователя, поэтому он входит в ETag."""
+    raw = ':'.join(map(str, (request.user.pk, *parts)))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def news_state_queryset(pk):
+    """
+    Данные новости, от которых зависит её страница.
+
+    Последний комментарий находится подзапросами по индексу,
+    строки комментариев не загружаются.
+    """
+    last_comment = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by('-created', '-pk')
+    return News.objects.filter(pk=pk).annotate(
+        last_created=Subquery(last_comment.values('created')[:1]),
+        last_comment_id=Subquery(last_comment.values('pk')[:1]),
+    ).values('date', 'comment_count', 'last_created', 'last_comment_id')
+
+
+def get_news_state(request, pk):
+    """Запоминаем состояние на время запроса: ETag и Last-Modified."""
+    if not hasattr(request, '_news_state'):
+        request._news_state = news_state_queryset(pk).first()
+    return request._news_state
+
+
+async def aget_news_state(request, pk):
+    if not hasattr(request, '_news_state'):
+        request._news_state = await news_state_queryset(pk).afirst()
+    return request._news_state
+
+
+def news_detail_etag(request, pk):
+    state = get_news_state(request, pk)
+    if state is None:
+        return None
+    return make_etag(request, *state.values(), get_news_version(pk))
+
+
+def news_detail_last_modified(request, pk):
+    state = get_news_state(request, pk)
+    if state is None:
+        return None
+    moments = [
+        datetime.combine(state['date'], time.min, tzinfo=timezone.utc),
+        version_to_datetime(get_news_version(pk)),
+    ]
+    if state['last_created'] is not None:
+        moments.append(state['last_created'])
+    return max(moments)
+
+
+def news_list_etag(request):
+    """Версия главной страницы меняется при любой записи новостей."""
+    return make_etag(request, get_home_version())
+
+
+def news_list_last_modified(request):
+    return version_to_datetime(get_home_version())
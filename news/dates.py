@@ -0,0 +1,100 @@
+"""
+Навигация по новостям по годам, месяцам и дням.
+
+Числа новостей за день хранятся в сводной таблице NewsDayCount,
+которую сигналы обновляют при записи и удалении новостей, а команды
+массовой загрузки пересчитывают целиком. Оглавление и счётчики
+периодов читают только её.
+"""
+from calendar import monthrange
+from contextvars import ContextVar
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+
+from .models import News, NewsDayCount
+from .routers import read_primary
+
+# Формат даты периода в заголовке и в списке вложенных периодов.
+PERIOD_FORMATS = {'year': 'Y', 'month': 'F Y', 'day': 'j E Y'}
+CHILD_LEVELS = {'year': 'month', 'month': 'day'}
+
+# Массовые операции выключают пересчёт дней в сигналах новостей
+# и пересчитывают затронутые дни сами, один раз (см. news.archive).
+skip_day_counts = ContextVar('skip_day_counts', default=False)
+
+
+def count_news_by_day(news):
+    return news.order_by().values('date').annotate(
+        count=Count('pk')
+    ).values_list('date', 'count')
+
+
+def save_day_counts(counts):
+    NewsDayCount.objects.bulk_create(
+        (NewsDayCount(date=day, count=count) for day, count in counts),
+        update_conflicts=True,
+        unique_fields=('date',),
+        update_fields=('count',),
+    )
+
+
+def refresh_day_counts(dates):
+    """Пересчитываем счётчики дней по индексу новостей по дате."""
+    # Значение по умолчанию у несохранённой новости - datetime.
+    to_date = News._meta.get_field('date').to_python
+    dates = {to_date(day) for day in dates}
+    counts = dict(count_news_by_day(
+        read_primary(News.objects.filter(date__in=dates))
+    ))
+    save_day_counts(counts.items())
+    NewsDayCount.objects.filter(date__in=dates - counts.keys()).delete()
+
+
+def rebuild_day_counts():
+    """Пересчитываем сводную таблицу целиком после массовой загрузки."""
+    with transaction.atomic():
+        NewsDayCount.objects.all().delete()
+        save_day_counts(count_news_by_day(News.objects.all()))
+
+
+def get_period(year, month=None, day=None):
+    """
+    Уровень периода, его первый и последний день.
+
+    Для несуществующей даты - ValueError.
+    """
+    if day is not None:
+        first = last = date(year, month, day)
+        return 'day', first, last
+    if month is not None:
+        first = date(year, month, 1)
+        return 'month', first, first.replace(day=monthrange(year, month)[1])
+    return 'year', date(year, 1, 1), date(year, 12, 31)
+
+
+def child_counts(level=None, first=None, last=None):
+    """
+    Вложенные периоды с числом новостей, от новых к старым.
+
+    Без уровня - годы для оглавления. Возвращаем пары (дата, число).
+    """
+    counts = NewsDayCount.objects.order_by()
+    if first is not None:
+        counts = counts.filter(date__range=(first, last))
+    if level == 'month':
+        return list(counts.order_by('-date').values_list('date', 'count'))
+    trunc = TruncMonth if level == 'year' else TruncYear
+    return list(counts.annotate(period=trunc('date')).values(
+        'period'
+    ).annotate(total=Sum('count')).order_by('-period').values_list(
+        'period', 'total'
+    ))
+
+
+def period_total(first, last):
+    return NewsDayCount.objects.filter(
+        date__range=(first, last)
+    ).aggregate(total=Sum('count'))['total'] or 0
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from news.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит новости старше заданного возраста вместе '
+        'с комментариями в архивные таблицы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.NEWS_ARCHIVE_AFTER_DAYS,
+            help='Возраст новости в днях, после которого она в архиве.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        before = timezone.now().date() - timedelta(days=options['days'])
+        total_news = total_comments = 0
+        while True:
+            news, comments = archive_batch(before, options['batch_size'])
+            if not news:
+                break
+            total_news += news
+            total_comments += comments
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив новостей: {total_news}, '
+            f'комментариев: {total_comments}'
+        ))
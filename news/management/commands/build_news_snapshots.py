@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.snapshots import build_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Отрисовывает HTML-снимки страниц новостей для анонимных '
+        'читателей, которые устарели после записи новости или комментария.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Пауза в секундах между проходами.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Сделать один проход и завершиться.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help=(
+                'Отрисовать снимки всех новостей, затем работать как обычно.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not settings.NEWS_SNAPSHOT_ROOT:
+            raise CommandError('Не задана настройка NEWS_SNAPSHOT_ROOT.')
+        rebuild = options['all']
+        total = 0
+        while True:
+            total += build_snapshots(rebuild=rebuild)
+            rebuild = False
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Отрисовано снимков: {total}')
+        )
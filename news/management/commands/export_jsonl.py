@@ -0,0 +1,54 @@
+import json
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from news.management.progress import Progress
+from news.models import Comment, News
+
+
+def isoformat(value):
+    """Даты сохраняются с полной точностью, до микросекунд."""
+    return value.isoformat()
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает новости и комментарии в формате JSON Lines. '
+        'Строки читаются из базы порциями, память не растёт с объёмом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл для выгрузки, «-» - стандартный вывод.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, path, chunk_size, **options):
+        if path == '-':
+            output = nullcontext(sys.stdout)
+        else:
+            output = open(path, 'w', encoding='utf-8')
+        progress = Progress(self.stderr, 'Выгружено')
+        with output as target:
+            for row in self.rows(chunk_size):
+                target.write(json.dumps(
+                    row, ensure_ascii=False, default=isoformat
+                ) + '\n')
+                progress.step()
+        progress.report()
+
+    def rows(self, chunk_size):
+        """Новости выгружаются раньше комментариев, ссылающихся на них."""
+        news = News.objects.order_by('pk').values(
+            'id', 'title', 'text', 'date'
+        )
+        for row in news.iterator(chunk_size=chunk_size):
+            yield {'model': 'news.news', **row}
+        comments = Comment.objects.order_by('pk').values(
+            'id', 'news', 'text', 'created', 'author__username'
+        )
+        for row in comments.iterator(chunk_size=chunk_size):
+            row['author'] = row.pop('author__username')
+            yield {'model': 'news.comment', **row}
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.queue import flush_comment_queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит комментарии из очереди отложенной записи '
+        'в комментарии пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.COMMENT_QUEUE_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            flushed = flush_comment_queue(options['batch_size'])
+            total += flushed
+            if flushed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Перенесено комментариев: {total}')
+        )
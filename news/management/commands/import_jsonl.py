@@ -0,0 +1,142 @@
+import json
+import sys
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+
+from news.cache import bump_feed_version, bump_home_version
+from news.dates import rebuild_day_counts
+from news.management.progress import Progress
+from news.models import Comment, News
+from news.rendering import make_excerpt, render_text
+from news.snapshots import invalidate_all_snapshots
+
+User = get_user_model()
+
+
+class AuthorCache:
+    """Небольшой LRU-кеш id пользователей по их именам."""
+
+    def __init__(self, size=10_000):
+        self.size = size
+        self.ids = OrderedDict()
+
+    def resolve(self, usernames):
+        """
+        Возвращаем id для всех имён одним запросом на порцию.
+
+        Отсутствующие пользователи создаются без пароля.
+        """
+        resolved = {}
+        missing = set()
+        for username in usernames:
+            if username in self.ids:
+                self.ids.move_to_end(username)
+                resolved[username] = self.ids[username]
+            else:
+                missing.add(username)
+        if missing:
+            found = dict(User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk'))
+            new_users = User.objects.bulk_create(
+                User(username=username, password=make_password(None))
+                for username in missing - found.keys()
+            )
+            found.update((user.username, user.pk) for user in new_users)
+            resolved.update(found)
+            self.ids.update(found)
+            while len(self.ids) > self.size:
+                self.ids.popitem(last=False)
+        return resolved
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости и комментарии из файла JSON Lines, '
+        'созданного командой export_jsonl. Строки сохраняются '
+        'порциями через bulk_create, каждая порция в своей транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл для загрузки, «-» - стандартный ввод.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, path, chunk_size, **options):
+        if path == '-':
+            source = nullcontext(sys.stdin)
+        else:
+            source = open(path, encoding='utf-8')
+        self.authors = AuthorCache()
+        self.progress = Progress(self.stderr, 'Загружено')
+        batches = {'news.news': [], 'news.comment': []}
+        savers = {
+            'news.news': self.save_news,
+            'news.comment': self.save_comments,
+        }
+        with source as lines:
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                model = row.pop('model', None)
+                if model not in batches:
+                    raise CommandError(
+                        f'Строка {line_number}: неизвестная модель {model}.'
+                    )
+                # Комментарии ссылаются на уже загруженные новости.
+                if model == 'news.comment' and batches['news.news']:
+                    self.flush(self.save_news, batches['news.news'])
+                batch = batches[model]
+                batch.append(row)
+                if len(batch) >= chunk_size:
+                    self.flush(savers[model], batch)
+        for model, batch in batches.items():
+            self.flush(savers[model], batch)
+        News.objects.recount_comments()
+        rebuild_day_counts()
+        bump_home_version()
+        bump_feed_version()
+        invalidate_all_snapshots()
+        self.progress.report()
+
+    def flush(self, save, batch):
+        if not batch:
+            return
+        with transaction.atomic():
+            save(batch)
+        self.progress.step(len(batch))
+        batch.clear()
+
+    def save_news(self, rows):
+        News.objects.bulk_create(
+            News(
+                id=row.get('id'),
+                title=row['title'],
+                text=row['text'],
+                excerpt=make_excerpt(row['text']),
+                date=parse_date(row['date']),
+            )
+            for row in rows
+        )
+
+    def save_comments(self, rows):
+        authors = self.authors.resolve(row['author'] for row in rows)
+        Comment.objects.bulk_create(
+            Comment(
+                id=row.get('id'),
+                news_id=row['news'],
+                author_id=authors[row['author']],
+                text=row['text'],
+                text_html=render_text(row['text']),
+                created=parse_datetime(row['created']),
+            )
+            for row in rows
+        )
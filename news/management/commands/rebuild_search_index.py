@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from news.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс новостей и комментариев.'
+
+    def handle(self, *args, **options):
+        rebuild_search_index(connection)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import bump_home_version
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у новостей.'
+
+    def handle(self, *args, **options):
+        updated = News.objects.recount_comments()
+        bump_home_version()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано новостей: {updated}')
+        )
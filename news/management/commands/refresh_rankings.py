@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from news.rankings import refresh_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        'Дополняет почасовые счётчики комментариев новыми комментариями '
+        'и перестраивает рейтинги новостей. Запускается периодически.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать счётчики заново, с учётом удалений.',
+        )
+
+    def handle(self, *args, **options):
+        counted = refresh_rankings(full=options['full'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Учтено новых комментариев: {counted}')
+        )
@@ -0,0 +1,27 @@
+import time
+
+
+class Progress:
+    """Печатает число обработанных строк и скорость обработки."""
+
+    def __init__(self, stream, verb, every=100_000):
+        self.stream = stream
+        self.verb = verb
+        self.every = every
+        self.count = 0
+        self.next_report = every
+        self.started = time.monotonic()
+
+    def step(self, count=1):
+        self.count += count
+        if self.count >= self.next_report:
+            self.report()
+            self.next_report += self.every
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.count / elapsed if elapsed else 0
+        self.stream.write(
+            f'{self.verb} строк: {self.count} за {elapsed:.1f} с '
+            f'({rate:.0f} строк/с)'
+        )
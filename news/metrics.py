@@ -0,0 +1,96 @@
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+# Имя метрики, тип и описание.
+METRICS = (
+    ('requests_total', 'counter', 'Обработано запросов.'),
+    ('request_seconds_total', 'counter', 'Суммарное время запросов.'),
+    ('db_queries_total', 'counter', 'Выполнено SQL-запросов.'),
+    ('db_seconds_total', 'counter', 'Суммарное время SQL-запросов.'),
+    (
+        'duplicate_queries_total', 'counter',
+        'Повторы одинаковых SQL-запросов в одном запросе (признак N+1).'
+    ),
+    (
+        'template_render_seconds_total', 'counter',
+        'Суммарное время рендера шаблонов.'
+    ),
+    (
+        'peak_allocated_bytes', 'gauge',
+        'Наибольший пик выделенной памяти за запрос.'
+    ),
+)
+PREFIX = 'yanews_'
+
+
+class MetricsRegistry:
+    """
+    Агрегаты по представлениям в памяти процесса.
+
+    У каждого процесса сервера свои агрегаты: Prometheus собирает
+    их с каждого процесса отдельно.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(lambda: defaultdict(float))
+
+    def record(self, view, **values):
+        with self.lock:
+            aggregates = self.views[view]
+            aggregates['requests_total'] += 1
+            for name, value in values.items():
+                if name == 'peak_allocated_bytes':
+                    aggregates[name] = max(aggregates[name], value)
+                else:
+                    aggregates[name] += value
+
+    def clear(self):
+        with self.lock:
+            self.views.clear()
+
+    def render(self):
+        """Текстовый формат экспозиции Prometheus."""
+        with self.lock:
+            views = {
+                view: dict(aggregates)
+                for view, aggregates in sorted(self.views.items())
+            }
+        lines = []
+        for name, metric_type, description in METRICS:
+            lines.append(f'# HELP {PREFIX}{name} {description}')
+            lines.append(f'# TYPE {PREFIX}{name} {metric_type}')
+            for view, aggregates in views.items():
+                lines.append(
+                    f'{PREFIX}{name}{{view="{view}"}} '
+                    f'{aggregates.get(name, 0):g}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def metrics(request):
+    """
+    Метрики для Prometheus.
+
+    Доступны по токену из настройки METRICS_TOKEN в заголовке
+    Authorization: Bearer <токен> или сотрудникам сайта.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    if not (
+        token and constant_time_compare(authorization, f'Bearer {token}')
+        or request.user.is_staff
+    ):
+        raise PermissionDenied
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
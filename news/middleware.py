@@ -0,0 +1,311 @@
+import logging
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http import HTTPMethod
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async
+)
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .metrics import registry
+from .routers import use_primary
+from .snapshots import snapshot_path
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """Считает SQL-запросы, их время и повторы одинаковых запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return {
+            sql: count for sql, count in self.statements.items() if count > 1
+        }
+
+
+# Счётчик SQL-запросов текущего HTTP-запроса. Контекстная переменная
+# переходит и в потоки sync_to_async, где асинхронные представления
+# выполняют запросы ORM.
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Подключаем record_query к каждому соединению с базой.
+
+    Обёртка ставится первой: execute_wrapper() снимает свои
+    обёртки с конца списка.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def view_label(view_func, method):
+    """
+    Имя представления для метрик.
+
+    Если представление передаёт запрос другим представлениям
+    (handler_views), метрики пишутся на то, что его обработало.
+    """
+    view_class = getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return view_func.__qualname__
+    handler_views = getattr(view_class, 'handler_views', {})
+    return handler_views.get(method.lower(), view_class).__name__
+
+
+class RequestMetricsMiddleware:
+    """
+    Собирает стоимость каждого запроса по представлениям.
+
+    Число и время SQL-запросов, время рендера шаблонов и, если
+    включена настройка METRICS_TRACE_MEMORY, пик выделенной памяти.
+    Повторяющиеся в одном запросе SQL-запросы пишутся в лог
+    как возможные N+1.
+
+    Работает и в синхронной, и в асинхронной цепочке middleware,
+    чтобы под ASGI асинхронные представления обходились без
+    перехода в поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Иначе Django обернёт обработчик в sync_to_async.
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.measure(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.measure(request):
+            return await self.get_response(request)
+
+    @contextmanager
+    def measure(self, request):
+        recorder = QueryRecorder()
+        request._metrics_render_seconds = 0
+        trace_memory = settings.METRICS_TRACE_MEMORY
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            yield
+        finally:
+            current_recorder.reset(token)
+        view = getattr(request, '_metrics_view', None)
+        match = getattr(request, 'resolver_match', None)
+        if view is None and match is not None:
+            view = view_label(match.func, request.method)
+        if view is None:
+            return
+        values = {
+            'request_seconds_total': time.perf_counter() - started,
+            'db_queries_total': recorder.count,
+            'db_seconds_total': recorder.seconds,
+            'duplicate_queries_total': sum(
+                count - 1 for count in recorder.duplicates.values()
+            ),
+            'template_render_seconds_total': request._metrics_render_seconds,
+        }
+        if trace_memory:
+            values['peak_allocated_bytes'] = tracemalloc.get_traced_memory()[1]
+        registry.record(view, **values)
+        for sql, count in recorder.duplicates.items():
+            logger.warning(
+                'Возможный N+1 в %s: запрос выполнен %d раз: %s',
+                view, count, sql
+            )
+
+    def process_template_response(self, request, response):
+        render = response.render
+
+        def timed_render():
+            started = time.perf_counter()
+            try:
+                return render()
+            finally:
+                request._metrics_render_seconds += (
+                    time.perf_counter() - started
+                )
+
+        response.render = timed_render
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        return self.process_template_response(request, response)
+
+
+SAFE_METHODS = {HTTPMethod.GET, HTTPMethod.HEAD, HTTPMethod.OPTIONS}
+PRIMARY_COOKIE = 'use_primary_until'
+
+
+class ReplicaPinMiddleware:
+    """
+    Закрепляет клиента за основной базой сразу после записи.
+
+    Запросы на запись читают с основной базы, а после успешной записи
+    клиент получает cookie, и ещё REPLICA_PIN_SECONDS секунд его чтения
+    тоже идут на основную базу, пока реплики догоняют её.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = use_primary.set(self.reads_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        return self.pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        token = use_primary.set(self.reads_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        return self.pin_after_write(request, response)
+
+    def reads_primary(self, request):
+        if request.method not in SAFE_METHODS:
+            return True
+        try:
+            pinned_until = float(request.COOKIES.get(PRIMARY_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return pinned_until > time.time()
+
+    def pin_after_write(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                str(time.time() + pin_seconds),
+                max_age=pin_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class NewsSnapshotMiddleware:
+    """
+    Отдаёт анонимным читателям готовые снимки страниц новостей.
+
+    Анонимность определяется по отсутствию cookie сессии, поэтому ни
+    сессия, ни база не читаются. Если снимка нет или у клиента есть
+    сессия, запрос обрабатывает обычное представление. Стоит последним
+    в MIDDLEWARE, чтобы ответ прошёл через остальные middleware.
+
+    Работает и в асинхронной цепочке: иначе под ASGI все middleware
+    выше него перешли бы в синхронный режим. Файл снимка там читается
+    в пуле потоков, не занимая поток синхронного кода запроса.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        path = self.snapshot_candidate(request)
+        snapshot = path and read_snapshot(path)
+        if not snapshot:
+            return self.get_response(request)
+        return self.snapshot_response(request, *snapshot)
+
+    async def __acall__(self, request):
+        path = self.snapshot_candidate(request)
+        snapshot = path and await sync_to_async(
+            read_snapshot, thread_sensitive=False
+        )(path)
+        if not snapshot:
+            return await self.get_response(request)
+        return self.snapshot_response(request, *snapshot)
+
+    def snapshot_candidate(self, request):
+        """Путь снимка, если запрос можно обслужить снимком."""
+        if (
+            not settings.NEWS_SNAPSHOT_ROOT
+            or request.method not in (HTTPMethod.GET, HTTPMethod.HEAD)
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+        ):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.view_name != 'news:detail':
+            return None
+        return snapshot_path(match.kwargs['pk'])
+
+    def snapshot_response(self, request, modified, content):
+        request._metrics_view = 'NewsSnapshot'
+        response = get_conditional_response(request, last_modified=modified)
+        if response is None:
+            response = HttpResponse(content)
+        response['Last-Modified'] = http_date(modified)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+def read_snapshot(path):
+    """Время изменения и содержимое снимка или None, если его нет."""
+    try:
+        return int(path.stat().st_mtime), path.read_bytes()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from news.search import drop_search_index, rebuild_search_index
+
+
+def create_search_index(apps, schema_editor):
+    rebuild_search_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_created_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField()),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='news.news')),
+            ],
+            options={
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['news', 'author'], name='queued_comment_news_author_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+from news.rendering import make_excerpt, render_text
+
+BATCH_SIZE = 2000
+
+
+def fill(model, source, target, render):
+    """Заполняем поле порциями, не загружая всю таблицу в память."""
+    batch = []
+    objects = model.objects.only(source).order_by('pk')
+    for obj in objects.iterator(chunk_size=BATCH_SIZE):
+        setattr(obj, target, render(getattr(obj, source)))
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_update(batch, [target])
+            batch = []
+    model.objects.bulk_update(batch, [target])
+
+
+def fill_rendered_text(apps, schema_editor):
+    fill(apps.get_model('news', 'News'), 'text', 'excerpt', make_excerpt)
+    fill(apps.get_model('news', 'Comment'), 'text', 'text_html', render_text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
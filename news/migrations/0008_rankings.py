@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_rendered_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('last_comment_id', models.PositiveBigIntegerField(default=0)),
+                ('news', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='news.news')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='comment_bucket_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('news', 'hour'), name='comment_bucket_news_hour')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RankedNews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ranking', models.CharField(max_length=20)),
+                ('position', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('news', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='news.news')),
+            ],
+            options={
+                'ordering': ('ranking', 'position'),
+                'constraints': [models.UniqueConstraint(fields=('ranking', 'position'), name='ranked_news_ranking_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_rankings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNews',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=50)),
+                ('text', models.TextField()),
+                ('date', models.DateField()),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('excerpt', models.TextField(default='')),
+            ],
+            options={
+                'verbose_name': 'Архивная новость',
+                'verbose_name_plural': 'Архивные новости',
+                'ordering': ('-date',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('text_html', models.TextField(default='')),
+                ('created', models.DateTimeField()),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='news.archivednews')),
+            ],
+            options={
+                'ordering': ('created',),
+                'indexes': [models.Index(fields=['news', 'created', 'id'], name='archived_comment_news_idx'), models.Index(fields=['author'], name='archived_comment_author_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_day_counts(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    NewsDayCount = apps.get_model('news', 'NewsDayCount')
+    db_alias = schema_editor.connection.alias
+    NewsDayCount.objects.using(db_alias).bulk_create(
+        NewsDayCount(date=day, count=count)
+        for day, count in News.objects.using(db_alias).order_by().values(
+            'date'
+        ).annotate(
+            count=Count('pk')
+        ).values_list('date', 'count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsDayCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-date',),
+            },
+        ),
+        migrations.RunPython(fill_day_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 23:10
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_watermark(apps, schema_editor):
+    CommentBucket = apps.get_model('news', 'CommentBucket')
+    RankingWatermark = apps.get_model('news', 'RankingWatermark')
+    db_alias = schema_editor.connection.alias
+    RankingWatermark.objects.using(db_alias).create(
+        pk=1,
+        last_comment_id=CommentBucket.objects.using(db_alias).aggregate(
+            last=Max('last_comment_id')
+        )['last'] or 0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_news_day_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_comment_id', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_watermark, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='commentbucket',
+            name='last_comment_id',
+        ),
+    ]
@@ -2,15 +2,62 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвигаем счётчик комментариев на delta."""
+        return self.update(comment_count=F('comment_count') + delta)
+
+    def recount_comments(self):
+        """Пересчитываем счётчик комментариев по таблице комментариев."""
+        comments = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.update(comment_count=Coalesce(Subquery(comments), 0))
+
+    def after(self, date, pk):
+        """
+        Новости, идущие в порядке ('-date', 'id') строго после пары.
+
+        Порядок совпадает с индексом news_date_id_idx.
+        """
+        return self.filter(Q(date__lt=date) | Q(date=date, pk__gt=pk))
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def after(self, created, pk):
+        """Комментарии, идущие строго после пары (created, id)."""
+        return self.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    # Отрывок текста для главной страницы, заполняется при сохранении.
+    excerpt = models.TextField(default='', editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -21,17 +68,205 @@ class News(models.Model):
 class Comment(models.Model):
     news = models.ForeignKey(
         News,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    text = models.TextField()
+    # Текст, готовый для вставки в страницу, заполняется при сохранении.
+    text_html = models.TextField(default='', editable=False)
+    # Не auto_now_add: при загрузке данных время сохраняется как есть.
+    created = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('created',)
+        # Индексы покрывают и внешние ключи: они идут первыми полями.
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='comment_author_created_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class NewsDayCount(models.Model):
+    """
+    Число новостей за день.
+
+    Небольшая сводная таблица для навигации по датам (news.dates):
+    счётчики годов и месяцев складываются из неё, а не группировкой
+    всей таблицы новостей. Обновляется при записи и удалении новостей.
+    """
+    date = models.DateField(unique=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-date',)
+
+    def __str__(self):
+        return f'{self.date}: {self.count}'
+
+
+class QueuedComment(models.Model):
+    """
+    Комментарий в очереди на запись.
+
+    В режиме отложенной записи (COMMENT_WRITE_BEHIND) проверенные
+    комментарии сначала попадают сюда, а в комментарии переносятся
+    пачками командой flush_comment_queue.
+    """
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    text = models.TextField()
+    created = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = (
+            models.Index(
+                fields=('news', 'author'),
+                name='queued_comment_news_author_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class CommentBucket(models.Model):
+    """
+    Число комментариев к новости за час.
+
+    Из этих счётчиков строятся рейтинги новостей; команда
+    refresh_rankings дополняет их комментариями с id больше
+    RankingWatermark.last_comment_id, не пересчитывая таблицу
+    комментариев.
+    """
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    hour = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('news', 'hour'), name='comment_bucket_news_hour',
+            ),
+        )
+        indexes = (
+            models.Index(fields=('hour',), name='comment_bucket_hour_idx'),
+        )
+
+
+class RankingWatermark(models.Model):
+    """
+    Наибольший id комментария, учтённый в CommentBucket.
+
+    Единственная строка. Хранится отдельно от счётчиков: они удаляются
+    вместе с новостями, и отметка не должна откатываться назад.
+    """
+    last_comment_id = models.PositiveBigIntegerField(default=0)
+
+
+class RankedNews(models.Model):
+    """Готовые места новостей в рейтингах, см. news.rankings."""
+    ranking = models.CharField(max_length=20)
+    position = models.PositiveSmallIntegerField()
+    news = models.ForeignKey(
+        News,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('ranking', 'position')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('ranking', 'position'),
+                name='ranked_news_ranking_position',
+            ),
+        )
+
+
+class ArchivedNews(models.Model):
+    """
+    Новость, перенесённая в архив командой archive_news.
+
+    Первичный ключ тот же, что был у новости, поэтому ссылки на неё
+    продолжают работать: страница новости ищет её здесь, если новости
+    нет в основной таблице.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=50)
+    text = models.TextField()
+    date = models.DateField()
+    comment_count = models.PositiveIntegerField(default=0)
+    excerpt = models.TextField(default='')
+
+    class Meta:
+        ordering = ('-date',)
+        verbose_name_plural = 'Архивные новости'
+        verbose_name = 'Архивная новость'
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    """Комментарий архивной новости; архив доступен только для чтения."""
+    id = models.BigIntegerField(primary_key=True)
+    news = models.ForeignKey(
+        ArchivedNews,
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    text_html = models.TextField(default='')
+    created = models.DateTimeField()
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='archived_comment_news_idx',
+            ),
+            models.Index(
+                fields=('author',), name='archived_comment_author_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
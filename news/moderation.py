@@ -0,0 +1,104 @@
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Латинские буквы и цифры, которыми подменяют похожие кириллические.
+LOOKALIKES = {
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к', 'm': 'м',
+    'o': 'о', 'p': 'р', 't': 'т', 'x': 'х', 'y': 'у', 'ё': 'е',
+    '0': 'о', '3': 'з',
+}
+VARIANTS = {}
+for lookalike, char in LOOKALIKES.items():
+    VARIANTS[char] = VARIANTS.get(char, char) + lookalike
+LOOKALIKES = str.maketrans(LOOKALIKES)
+
+
+def normalize(text):
+    """Приводим текст к нижнему регистру и кириллическим буквам."""
+    return text.lower().translate(LOOKALIKES)
+
+
+class SubstringMatcher:
+    """Поиск каждого слова по очереди: O(слов × длина текста)."""
+
+    def __init__(self, words):
+        self.words = tuple(normalize(word) for word in words)
+
+    def search(self, text):
+        text = normalize(text)
+        return any(word in text for word in self.words)
+
+
+class RegexMatcher:
+    """
+    Все слова собраны в одно регулярное выражение по префиксному дереву.
+
+    Общие префиксы слов проверяются один раз, поэтому проверка
+    занимает время, линейное по длине текста, независимо от размера
+    списка. Похожие латинские буквы входят в выражение классами
+    символов, так что текст не нужно перекодировать. Слово ищется
+    с начала слова текста, чтобы ловить словоформы, но не части
+    других слов.
+    """
+
+    def __init__(self, words):
+        trie = {}
+        for word in filter(None, map(normalize, words)):
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        pattern = self.render(trie) if trie else '(?!)'
+        self.pattern = re.compile(rf'\b{pattern}')
+
+    @classmethod
+    def render(cls, node):
+        if '' in node:
+            # Слово-префикс уже совпало, продолжения проверять незачем.
+            return ''
+        branches = [
+            cls.render_char(char) + cls.render(child)
+            for char, child in sorted(node.items())
+        ]
+        if len(branches) == 1:
+            return branches[0]
+        return f'(?:{"|".join(branches)})'
+
+    @staticmethod
+    def render_char(char):
+        if char in VARIANTS:
+            return f'[{re.escape(VARIANTS[char])}]'
+        return re.escape(char)
+
+    def search(self, text):
+        return self.pattern.search(text.lower()) is not None
+
+
+def read_words_file(path):
+    with open(path, encoding='utf-8') as words_file:
+        return tuple(line.strip() for line in words_file if line.strip())
+
+
+@lru_cache(maxsize=1)
+def build_matcher(matcher_path, words, words_file, words_file_mtime):
+    if words_file:
+        words += read_words_file(words_file)
+    return import_string(matcher_path)(words)
+
+
+def get_bad_words_matcher(words):
+    """
+    Матчер строится один раз и переиспользуется между запросами.
+
+    Он пересобирается сам, если изменился список слов или файл
+    со словами из настройки BAD_WORDS_FILE.
+    """
+    words_file = settings.BAD_WORDS_FILE
+    mtime = os.stat(words_file).st_mtime_ns if words_file else None
+    return build_matcher(
+        settings.BAD_WORDS_MATCHER, tuple(words), words_file, mtime
+    )
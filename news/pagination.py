@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+
+from .authors import display_names
+from .models import Comment
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Поля, которые выводит шаблон news/comments.html. От автора нужен
+# только id: имя берётся из кеша news.authors, без соединения таблиц.
+RENDER_FIELDS = ('created', 'text_html', 'author')
+
+
+def encode_cursor(comment):
+    """Курсор - пара (created, id) последнего показанного комментария."""
+    return f'{(comment.created - EPOCH) // MICROSECOND}-{comment.pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, pk = map(int, cursor.split('-'))
+        return EPOCH + timestamp * MICROSECOND, pk
+    except (ValueError, OverflowError):
+        raise BadRequest('Некорректный курсор.')
+
+
+def encode_news_cursor(news):
+    """Курсор новостей - пара (date, id) последней показанной новости."""
+    return f'{news.date.toordinal()}-{news.pk}'
+
+
+def decode_news_cursor(cursor):
+    try:
+        ordinal, pk = map(int, cursor.split('-'))
+        return date.fromordinal(ordinal), pk
+    except (ValueError, OverflowError):
+        raise BadRequest('Некорректный курсор.')
+
+
+def comment_page_queryset(news_id, cursor=None, model=Comment):
+    """
+    Страница комментариев к новости, начиная после курсора.
+
+    Выборка идёт по ключу (created, id), поэтому стоимость любой
+    страницы не зависит от её номера. Размер страницы задаётся
+    в настройках проекта; лишний комментарий показывает, есть ли
+    следующая страница. Комментарии архивных новостей читаются
+    из модели ArchivedComment.
+    """
+    comments = model.objects.filter(news_id=news_id).only(
+        *RENDER_FIELDS
+    ).order_by('created', 'pk')
+    if cursor:
+        comments = comments.after(*decode_cursor(cursor))
+    return comments[:settings.COMMENTS_COUNT_ON_PAGE + 1]
+
+
+def make_page(items, page_size, encode, name='comments'):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode(items[-1])
+    return {name: items, 'next_cursor': next_cursor}
+
+
+def make_comment_page(comments):
+    return make_page(
+        comments, settings.COMMENTS_COUNT_ON_PAGE, encode_cursor
+    )
+
+
+def get_news_page(news, cursor=None):
+    """
+    Страница новостей в порядке ('-date', 'id'), начиная после курсора.
+
+    Как и у комментариев, выборка идёт по ключу и не зависит
+    от номера страницы.
+    """
+    page_size = settings.NEWS_COUNT_ON_DATE_PAGE
+    news = news.order_by('-date', 'pk')
+    if cursor:
+        news = news.after(*decode_news_cursor(cursor))
+    return make_page(
+        list(news[:page_size + 1]), page_size, encode_news_cursor,
+        'news_list',
+    )
+
+
+def add_author_names(comments, names):
+    for comment in comments:
+        comment.author_name = names.get(comment.author_id, '')
+
+
+def get_comment_page(news_id, cursor=None, model=Comment):
+    page = make_comment_page(
+        list(comment_page_queryset(news_id, cursor, model))
+    )
+    add_author_names(page['comments'], display_names.get_many(
+        comment.author_id for comment in page['comments']
+    ))
+    return page
+
+
+async def aget_comment_page(news_id, cursor=None, model=Comment):
+    page = make_comment_page([
+        comment async for comment
+        in comment_page_queryset(news_id, cursor, model).aiterator()
+    ])
+    add_author_names(page['comments'], await display_names.aget_many(
+        comment.author_id for comment in page['comments']
+    ))
+    return page
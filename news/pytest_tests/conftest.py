@@ -1,12 +1,24 @@
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from django.test.client import Client
 from django.urls import reverse
 from django.utils import timezone
 
+from news.authors import display_names
 from news.models import Comment, News
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура для очистки кешей между тестами."""
+    cache.clear()
+    display_names.clear()
+    yield
+    cache.clear()
+    display_names.clear()
+
+
 @pytest.fixture
 def author(django_user_model):
     """Фикстура для создания модели автора."""
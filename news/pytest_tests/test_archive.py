@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from news.dates import rebuild_day_counts, refresh_day_counts
+from news.models import (
+    ArchivedComment, ArchivedNews, Comment, News, NewsDayCount, QueuedComment
+)
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def old_news(author):
+    """Фикстура для создания старой новости с комментариями."""
+    news = News.objects.create(
+        title='Старая новость',
+        text='Давний текст.',
+        date=timezone.now().date() - timezone.timedelta(days=400),
+    )
+    for index in range(5):
+        Comment.objects.create(
+            news=news, author=author, text=f'Комментарий {index}'
+        )
+    return news
+
+
+def test_archive_moves_old_news(old_news, news, comment):
+    """Тест переноса в архив только старых новостей с комментариями."""
+    call_command('archive_news', days=365, batch_size=1)
+    assert not News.objects.filter(pk=old_news.pk).exists()
+    assert not Comment.objects.filter(news_id=old_news.pk).exists()
+    archived = ArchivedNews.objects.get(pk=old_news.pk)
+    assert (archived.title, archived.comment_count) == (old_news.title, 5)
+    assert archived.excerpt == old_news.excerpt
+    assert ArchivedComment.objects.filter(news=archived).count() == 5
+    assert News.objects.filter(pk=news.pk).exists()
+    assert Comment.objects.filter(pk=comment.pk).exists()
+
+
+def test_archive_recounts_days_once(
+    old_news, news, django_capture_on_commit_callbacks
+):
+    """Тест одного пересчёта дней на пачку архивируемых новостей."""
+    News.objects.create(title='Ещё старая', text='Текст.', date=old_news.date)
+    rebuild_day_counts()
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        call_command('archive_news', days=365)
+    recounts = [
+        callback for callback in callbacks
+        if getattr(callback, 'func', None) is refresh_day_counts
+    ]
+    assert len(recounts) == 1
+    assert recounts[0].args == ({old_news.date},)
+    assert not NewsDayCount.objects.filter(date=old_news.date).exists()
+    assert NewsDayCount.objects.get().count == 1
+
+
+def test_archive_skips_news_with_queued_comments(old_news, author):
+    """Тест: новость с комментариями в очереди остаётся в основной таблице."""
+    QueuedComment.objects.create(news=old_news, author=author, text='Текст')
+    call_command('archive_news', days=365)
+    assert News.objects.filter(pk=old_news.pk).exists()
+    assert not ArchivedNews.objects.exists()
+
+
+def test_archived_news_detail(old_news, author_client, author):
+    """Тест страницы архивной новости без формы и ссылок на правку."""
+    call_command('archive_news', days=365)
+    response = author_client.get(reverse('news:detail', args=(old_news.pk,)))
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['archived']
+    assert 'form' not in response.context
+    content = response.content.decode()
+    assert old_news.title in content
+    assert content.count('Комментарий ') == 5
+    assert 'Редактировать' not in content
+
+
+def test_archived_comments_pagination(old_news, client, settings):
+    """Тест постраничного вывода комментариев архивной новости."""
+    settings.COMMENTS_COUNT_ON_PAGE = 2
+    call_command('archive_news', days=365)
+    response = client.get(reverse('news:detail', args=(old_news.pk,)))
+    seen = list(response.context['comments'])
+    assert 'archived=1' in response.content.decode()
+    cursor = response.context['next_cursor']
+    while cursor:
+        response = client.get(
+            reverse('news:comments', args=(old_news.pk,)),
+            {'cursor': cursor, 'archived': 1},
+        )
+        seen += response.context['comments']
+        cursor = response.context['next_cursor']
+    assert seen == list(ArchivedComment.objects.order_by('created', 'pk'))
+
+
+def test_missing_news_is_not_found(client):
+    """Тест ответа 404, если новости нет ни в одной из таблиц."""
+    response = client.get(reverse('news:detail', args=(404,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
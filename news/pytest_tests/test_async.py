@@ -0,0 +1,104 @@
+import logging
+from datetime import timedelta
+from http import HTTPStatus
+from importlib import reload
+
+import pytest
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.urls import clear_url_caches, resolve
+
+import news.urls
+import yanews.urls
+from news.views import AsyncNewsList
+
+
+pytestmark = pytest.mark.django_db
+
+
+def reload_urls():
+    reload(news.urls)
+    reload(yanews.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    """Фикстура для подключения асинхронных представлений."""
+    settings.NEWS_ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.NEWS_ASYNC_VIEWS = False
+    reload_urls()
+
+
+def test_async_views_are_selected(async_views, urls):
+    """Тест выбора асинхронных представлений настройкой."""
+    for url_key in ('HOME', 'NEWS_DETAIL'):
+        assert resolve(urls[url_key]).func.view_class.view_is_async
+
+
+def test_asgi_middleware_chain_stays_async(settings, caplog):
+    """Тест: под ASGI ни одно middleware не переводит цепочку в потоки."""
+    settings.DEBUG = True
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        ASGIHandler()
+    assert 'adapted for middleware' not in caplog.text
+
+
+def test_async_home_page(async_views, news, client, urls):
+    """Тест главной страницы и ответа 304 в асинхронном режиме."""
+    response = client.get(urls['HOME'])
+    assert response.status_code == HTTPStatus.OK
+    assert news.title in response.content.decode()
+    response = client.get(urls['HOME'], HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_async_home_page_fragment_evicted_before_render(
+    async_views, news, client, urls, monkeypatch
+):
+    """Тест: фрагмент пропал после проверки - список всё равно выводится."""
+    async def fragment_cached(self, context):
+        return True
+
+    monkeypatch.setattr(AsyncNewsList, 'fragment_cached', fragment_cached)
+    assert news.title in client.get(urls['HOME']).content.decode()
+    monkeypatch.undo()
+    assert news.title in client.get(urls['HOME']).content.decode()
+
+
+def test_async_detail_page(async_views, comment, author_client, urls):
+    """Тест страницы новости в асинхронном режиме."""
+    response = author_client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['comments'] == [comment]
+    assert 'form' in response.context
+    response = author_client.get(
+        urls['NEWS_DETAIL'], HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_async_archived_detail_page(async_views, comment, client, urls):
+    """Тест страницы архивной новости в асинхронном режиме."""
+    comment.news.date -= timedelta(days=400)
+    comment.news.save()
+    call_command('archive_news', days=365)
+    response = client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['archived']
+    assert comment.text in response.content.decode()
+
+
+def test_async_detail_page_not_found(async_views, client):
+    """Тест ответа 404 для несуществующей новости."""
+    response = client.get('/news/0/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_async_comment_post(async_views, author_client, news, urls):
+    """Тест создания комментария через асинхронное представление."""
+    response = author_client.post(urls['NEWS_DETAIL'], data={'text': 'Текст'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert news.comment_set.count() == 2
@@ -1,6 +1,17 @@
+import time
+from http import HTTPStatus
+
 import pytest
+from django.db import connection
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
+from news import authors
+from news.cache import get_home_version
 from news.forms import CommentForm
+from news.models import Comment
+from news.template_cache import warm_template_cache
 from yanews.settings import NEWS_COUNT_ON_HOME_PAGE
 
 
@@ -45,3 +56,169 @@ def test_authorized_client_has_form(author_client, urls):
     response = author_client.get(urls['NEWS_DETAIL'])
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+def test_home_page_single_query(
+    client, news_to_pagginate, django_assert_num_queries
+):
+    """Тест вывода главной страницы одним запросом."""
+    with django_assert_num_queries(1):
+        client.get(reverse('news:home'))
+
+
+def test_home_page_loads_only_excerpt(client, news):
+    """Тест загрузки на главную отрывка вместо полного текста новости."""
+    response = client.get(reverse('news:home'))
+    news_on_page = response.context['object_list'][0]
+    assert 'text' in news_on_page.get_deferred_fields()
+    assert news_on_page.excerpt
+    assert news_on_page.excerpt in response.content.decode()
+
+
+def test_detail_page_loads_only_rendered_columns(
+    client, comment_to_pagginate, urls
+):
+    """Тест загрузки для страницы новости только выводимых полей."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.OK
+    # Состояние для ETag, новость, страница комментариев, имена авторов.
+    assert len(queries) == 4
+    sql = ' '.join(query['sql'] for query in queries)
+    assert 'JOIN "auth_user"' not in sql
+    for column in ('"password"', '"email"', '"news_comment"."text"'):
+        assert column not in sql
+    author_name = comment_to_pagginate.author.username
+    assert author_name in response.content.decode()
+
+
+def test_comment_authors_come_from_name_cache(
+    settings, author_client, news, author, urls, django_assert_num_queries
+):
+    """Тест страницы из 1000 комментариев без загрузки пользователей."""
+    settings.COMMENTS_COUNT_ON_PAGE = 1000
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(1000)
+    )
+    author_client.get(urls['NEWS_DETAIL'])
+    # Сессия, пользователь, состояние, новость, комментарии.
+    with django_assert_num_queries(5) as queries:
+        response = author_client.get(urls['NEWS_DETAIL'])
+    comments_sql = queries.captured_queries[-1]['sql']
+    assert 'auth_user' not in comments_sql
+    content = response.content.decode()
+    assert content.count(author.username) > 1000
+    assert content.count('Редактировать') == 1000
+
+
+def test_comment_author_name_expires(
+    settings, monkeypatch, comment, author, client, urls
+):
+    """Тест обновления имени автора, сменённого в другом процессе."""
+    settings.DISPLAY_NAME_CACHE_TIMEOUT = 60
+    client.get(urls['NEWS_DETAIL'])
+    # Сигнал сработал бы только в процессе, сохранившем пользователя.
+    type(author).objects.filter(pk=author.pk).update(username='Новое имя')
+    assert 'Новое имя' not in client.get(
+        urls['NEWS_DETAIL']
+    ).content.decode()
+    now = time.monotonic()
+    monkeypatch.setattr(authors.time, 'monotonic', lambda: now + 61)
+    assert 'Новое имя' in client.get(urls['NEWS_DETAIL']).content.decode()
+
+
+def test_comments_keyset_pagination(
+    news, comment_to_pagginate, client, settings
+):
+    """Тест постраничного вывода комментариев по курсору."""
+    settings.COMMENTS_COUNT_ON_PAGE = 3
+    response = client.get(reverse('news:detail', args=(news.id,)))
+    seen = list(response.context['comments'])
+    assert len(seen) == settings.COMMENTS_COUNT_ON_PAGE
+    cursor = response.context['next_cursor']
+    while cursor:
+        response = client.get(
+            reverse('news:comments', args=(news.id,)), {'cursor': cursor}
+        )
+        seen += response.context['comments']
+        cursor = response.context['next_cursor']
+    assert seen == list(news.comment_set.order_by('created', 'pk'))
+
+
+@pytest.mark.parametrize('cursor', ('abc', '99999999999999999999-1'))
+def test_comments_page_rejects_bad_cursor(news, client, cursor):
+    """Тест ответа на некорректный курсор."""
+    response = client.get(
+        reverse('news:comments', args=(news.id,)), {'cursor': cursor}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    'backend',
+    (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.filebased.FileBasedCache',
+    )
+)
+def test_home_page_cache_invalidation(
+    backend, client, news, settings, tmp_path, django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    """Тест кеширования главной страницы и его сброса при изменениях."""
+    settings.CACHES = {
+        'default': {'BACKEND': backend, 'LOCATION': str(tmp_path)}
+    }
+    url = reverse('news:home')
+    client.get(url)
+    with django_assert_num_queries(0):
+        client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        news.title = 'Новый заголовок'
+        news.save()
+    assert news.title in client.get(url).content.decode()
+
+
+def test_home_version_bumped_after_commit(
+    news, django_capture_on_commit_callbacks
+):
+    """Тест сдвига версии главной страницы только после фиксации."""
+    version = get_home_version()
+    with django_capture_on_commit_callbacks() as callbacks:
+        news.title = 'Новый заголовок'
+        news.save()
+        assert get_home_version() == version
+    for callback in callbacks:
+        callback()
+    assert get_home_version() != version
+
+
+@pytest.mark.parametrize('url_key', ('HOME', 'NEWS_DETAIL'))
+def test_conditional_get(
+    url_key, comment, client, urls, django_assert_max_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    """Тест ответа 304 на неизменившуюся страницу без её рендера."""
+    url = urls[url_key]
+    etag = client.get(url)['ETag']
+    with django_assert_max_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.text = 'Изменённый комментарий'
+        comment.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_warm_template_cache():
+    """Тест прогрева кеша шаблонов страниц новостей и регистрации."""
+    loader = engines['django'].engine.template_loaders[0]
+    loader.reset()
+    assert warm_template_cache() > 0
+    for name in (
+        'base.html', 'includes/header.html', 'news/home.html',
+        'news/detail.html', 'registration/login.html',
+    ):
+        assert name in loader.get_template_cache
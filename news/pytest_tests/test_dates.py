@@ -0,0 +1,157 @@
+from datetime import date, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.dates import rebuild_day_counts
+from news.models import News, NewsDayCount
+
+
+pytestmark = pytest.mark.django_db
+
+DAY = date(2024, 2, 29)
+
+
+@pytest.fixture
+def dated_news(django_capture_on_commit_callbacks):
+    """Фикстура для создания новостей за несколько дней двух лет."""
+    days = (DAY, DAY, DAY - timedelta(days=1), date(2023, 12, 31))
+    with django_capture_on_commit_callbacks(execute=True):
+        return [
+            News.objects.create(
+                title=f'Новость {index}', text='Текст.', date=day
+            )
+            for index, day in enumerate(days)
+        ]
+
+
+def day_counts():
+    return dict(NewsDayCount.objects.values_list('date', 'count'))
+
+
+def test_day_counts_follow_news_changes(
+    dated_news, django_capture_on_commit_callbacks
+):
+    """Тест обновления сводной таблицы при записи и удалении новостей."""
+    assert day_counts() == {
+        DAY: 2, DAY - timedelta(days=1): 1, date(2023, 12, 31): 1,
+    }
+    with django_capture_on_commit_callbacks(execute=True):
+        dated_news[0].date = DAY - timedelta(days=1)
+        dated_news[0].save()
+    assert day_counts()[DAY] == 1
+    assert day_counts()[DAY - timedelta(days=1)] == 2
+    with django_capture_on_commit_callbacks(execute=True):
+        dated_news[3].delete()
+    assert date(2023, 12, 31) not in day_counts()
+
+
+def test_day_counts_wait_for_commit(
+    dated_news, django_capture_on_commit_callbacks
+):
+    """Тест: счётчики дней пересчитываются только после фиксации."""
+    with django_capture_on_commit_callbacks() as callbacks:
+        News.objects.create(title='Новость', text='Текст.', date=DAY)
+    assert day_counts()[DAY] == 2
+    for callback in callbacks:
+        callback()
+    assert day_counts()[DAY] == 3
+
+
+def test_admin_date_change_moves_count(
+    dated_news, admin_client, django_capture_on_commit_callbacks
+):
+    """Тест переноса новости на другой день через админку."""
+    news = dated_news[3]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(
+            reverse('admin:news_news_change', args=(news.pk,)),
+            {
+                'title': news.title,
+                'text': news.text,
+                'date': DAY.isoformat(),
+                'comment_set-TOTAL_FORMS': 0,
+                'comment_set-INITIAL_FORMS': 0,
+            },
+        )
+    assert response.status_code == HTTPStatus.FOUND
+    assert day_counts() == {DAY: 3, DAY - timedelta(days=1): 1}
+
+
+def test_rebuild_day_counts(news_to_pagginate):
+    """Тест пересчёта сводной таблицы после bulk_create."""
+    assert not NewsDayCount.objects.exists()
+    rebuild_day_counts()
+    assert sum(day_counts().values()) == len(news_to_pagginate)
+
+
+def test_dates_index_reads_summary_table(dated_news, client):
+    """Тест оглавления по годам без группировки таблицы новостей."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('news:dates'))
+    periods = [
+        (item['date'].year, item['count'])
+        for item in response.context['periods']
+    ]
+    assert periods == [(2024, 3), (2023, 1)]
+    assert all('"news_news"' not in query['sql'] for query in queries)
+
+
+def test_month_page(dated_news, client):
+    """Тест страницы месяца: число новостей, дни и сами новости."""
+    response = client.get(reverse('news:dates_month', args=(2024, 2)))
+    assert response.context['total'] == 3
+    assert [
+        (item['date'], item['count']) for item in response.context['periods']
+    ] == [(DAY, 2), (DAY - timedelta(days=1), 1)]
+    assert response.context['news_list'] == dated_news[:3]
+
+
+def test_day_page_keyset_pagination(
+    settings, client, django_capture_on_commit_callbacks
+):
+    """Тест постраничного вывода новостей за день по курсору."""
+    settings.NEWS_COUNT_ON_DATE_PAGE = 3
+    with django_capture_on_commit_callbacks(execute=True):
+        created = [
+            News.objects.create(
+                title=f'Новость {index}', text='Текст.', date=DAY
+            )
+            for index in range(10)
+        ]
+    url = reverse('news:dates_day', args=(DAY.year, DAY.month, DAY.day))
+    response = client.get(url)
+    assert response.context['total'] == 10
+    seen = list(response.context['news_list'])
+    cursor = response.context['next_cursor']
+    while cursor:
+        response = client.get(url, {'cursor': cursor})
+        seen += response.context['news_list']
+        cursor = response.context['next_cursor']
+    assert seen == created
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:dates_year', (0,)),
+        ('news:dates_month', (2024, 13)),
+        ('news:dates_day', (2023, 2, 29)),
+    )
+)
+def test_invalid_date_not_found(client, name, args):
+    """Тест ответа 404 на несуществующую дату."""
+    assert client.get(reverse(name, args=args)).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_dates_page_rejects_bad_cursor(client):
+    """Тест ответа на некорректный курсор."""
+    response = client.get(
+        reverse('news:dates_year', args=(2024,)), {'cursor': '0-1'}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
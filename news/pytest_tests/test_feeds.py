@@ -0,0 +1,94 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from news.models import News
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize('format', ('rss', 'atom', 'json'))
+def test_feed_is_served_from_cache(
+    format, client, news, django_assert_num_queries
+):
+    """Тест ленты: повторный опрос не обращается к базе."""
+    url = reverse('news:feed', args=(format,))
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert news.title in response.content.decode()
+    with django_assert_num_queries(0):
+        cached = client.get(url)
+    assert cached.content == response.content
+    assert cached['ETag'] == response['ETag']
+
+
+def test_json_feed(client, news):
+    """Тест содержимого JSON Feed."""
+    response = client.get(reverse('news:feed', args=('json',)))
+    assert response['Content-Type'].startswith('application/feed+json')
+    items = json.loads(response.content)['items']
+    assert [item['title'] for item in items] == [news.title]
+    assert items[0]['url'].endswith(reverse('news:detail', args=(news.pk,)))
+
+
+def test_feed_gzip_and_etag(client, news):
+    """Тест сжатой ленты и ответа 304 по ETag."""
+    url = reverse('news:feed', args=('rss',))
+    plain = client.get(url)
+    compressed = client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert compressed['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.content) == plain.content
+    response = client.get(url, HTTP_IF_NONE_MATCH=plain['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize(
+    'accept_encoding, gzipped',
+    (
+        ('gzip;q=0, deflate', False),
+        ('*;q=0.5', True),
+        ('*, gzip;q=0', False),
+        ('br;q=1.0, gzip;q=0.8', True),
+    ),
+)
+def test_feed_gzip_respects_quality(client, news, accept_encoding, gzipped):
+    """Тест выбора сжатия по q-значениям Accept-Encoding."""
+    response = client.get(
+        reverse('news:feed', args=('rss',)),
+        HTTP_ACCEPT_ENCODING=accept_encoding,
+    )
+    assert (response.get('Content-Encoding') == 'gzip') is gzipped
+
+
+def test_feed_links_follow_scheme(client, news):
+    """Тест: ленты по http и https кешируются отдельно."""
+    url = reverse('news:feed', args=('json',))
+    for secure, scheme in ((False, 'http'), (True, 'https')):
+        items = json.loads(client.get(url, secure=secure).content)['items']
+        assert items[0]['url'].startswith(f'{scheme}://')
+
+
+def test_feed_changes_only_with_news(
+    client, news, comment, author_client, urls,
+    django_capture_on_commit_callbacks,
+):
+    """Тест обновления ленты при записи новостей, но не комментариев."""
+    url = reverse('news:feed', args=('atom',))
+    etag = client.get(url)['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(urls['NEWS_DETAIL'], data={'text': 'Новый'})
+    assert client.get(url)['ETag'] == etag
+    with django_capture_on_commit_callbacks(execute=True):
+        News.objects.create(title='Свежая новость', text='Текст')
+    response = client.get(url)
+    assert response['ETag'] != etag
+    assert 'Свежая новость' in response.content.decode()
+
+
+def test_unknown_feed_format(client):
+    """Тест ответа 404 на неизвестный формат ленты."""
+    response = client.get(reverse('news:feed', args=('yaml',)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
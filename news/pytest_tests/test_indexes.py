@@ -0,0 +1,50 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+
+from news.models import Comment, News
+from news.pagination import decode_cursor, encode_cursor
+
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Планы запросов проверяются только для SQLite.'
+    ),
+]
+
+
+def assert_uses_index(queryset, index_name):
+    """Запрос читает индекс и не сортирует строки отдельно."""
+    plan = queryset.explain()
+    assert f'USING INDEX {index_name}' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_home_page_uses_date_index():
+    """Тест использования индекса при выводе главной страницы."""
+    assert_uses_index(
+        News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE],
+        'news_date_id_idx'
+    )
+
+
+def test_comment_page_uses_news_index(comment):
+    """Тест использования индекса при выводе страницы комментариев."""
+    comments = Comment.objects.filter(
+        news_id=comment.news_id
+    ).order_by('created', 'pk')
+    assert_uses_index(comments, 'comment_news_created_idx')
+    assert_uses_index(
+        comments.after(*decode_cursor(encode_cursor(comment))),
+        'comment_news_created_idx'
+    )
+
+
+def test_author_comments_use_author_index(author):
+    """Тест использования индекса при выборке комментариев автора."""
+    assert_uses_index(
+        Comment.objects.filter(author=author),
+        'comment_author_created_idx'
+    )
@@ -1,10 +1,13 @@
+import os
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
 from pytest_django.asserts import assertFormError, assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import BAD_WORDS, WARNING, CommentForm
+from news.models import Comment, News, QueuedComment
 
 
 FORM_DATA = {'text': 'Новый текст'}
@@ -76,6 +79,13 @@ def test_author_can_edit_comment(author_client, comment, urls):
     assert comment.text == FORM_DATA['text']
 
 
+def test_comment_html_follows_edit(author_client, comment, urls):
+    """Тест обновления готового HTML комментария при изменении."""
+    author_client.post(urls['EDIT'], data={'text': 'Первая <b>\nвторая'})
+    comment.refresh_from_db()
+    assert comment.text_html == 'Первая &lt;b&gt;<br>вторая'
+
+
 def test_user_cant_edit_comment_of_another_user(
     not_author_client, comment, urls
 ):
@@ -84,3 +94,203 @@ def test_user_cant_edit_comment_of_another_user(
     assert response.status_code == HTTPStatus.NOT_FOUND
     comment_from_db = Comment.objects.latest('id')
     assert comment.text == comment_from_db.text
+
+
+def test_comment_count_follows_create_and_delete(author_client, news, urls):
+    """Тест обновления счётчика комментариев при создании и удалении."""
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    author_client.post(urls['NEWS_DETAIL'], data=FORM_DATA)
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    author_client.post(urls['DELETE'])
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_recount_comments_command(news, comment):
+    """Тест пересчёта счётчиков комментариев командой."""
+    News.objects.filter(pk=news.pk).update(comment_count=42)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == news.comment_set.count()
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        'Ты рeдиска!',  # Латинская «e».
+        'Какие-то РЕДИСКАМИ стали.',
+        'нeгoдяй',
+    )
+)
+def test_bad_words_lookalikes_and_word_forms(text):
+    """Тест поиска запрещённых слов с подменой букв и в словоформах."""
+    form = CommentForm(data={'text': text})
+    assert not form.is_valid()
+    assert form.errors['text'] == [WARNING]
+
+
+def test_bad_words_matcher_reloads_words_file(settings, tmp_path):
+    """Тест пересборки матчера при изменении файла со словами."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('бяка\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    assert not CommentForm(data={'text': 'Ты бяка'}).is_valid()
+    assert CommentForm(data={'text': 'Ты бука'}).is_valid()
+    words_file.write_text('бяка\nбука\n', encoding='utf-8')
+    os.utime(words_file, ns=(0, 0))
+    assert not CommentForm(data={'text': 'Ты бука'}).is_valid()
+
+
+def test_jsonl_export_import_roundtrip(comment_to_pagginate, tmp_path):
+    """Тест выгрузки и загрузки новостей и комментариев в JSON Lines."""
+    path = tmp_path / 'news.jsonl'
+    fields = ('id', 'news', 'author__username', 'text', 'created')
+    comments = list(Comment.objects.values_list(*fields))
+    call_command('export_jsonl', path, stderr=StringIO())
+    News.objects.all().delete()
+    call_command('import_jsonl', path, chunk_size=3, stderr=StringIO())
+    assert list(Comment.objects.values_list(*fields)) == comments
+    news = News.objects.get()
+    assert news.comment_count == len(comments)
+
+
+@pytest.mark.parametrize(
+    'url_key, data, expected_queries',
+    (
+        # Сессия, пользователь, новость, комментарий, счётчик.
+        ('NEWS_DETAIL', FORM_DATA, 5),
+        # Сессия, пользователь, комментарий, изменение.
+        ('EDIT', FORM_DATA, 4),
+        # Сессия, пользователь, комментарий, удаление, счётчик.
+        ('DELETE', None, 5),
+    )
+)
+def test_comment_write_queries(
+    url_key, data, expected_queries, author_client, urls,
+    django_assert_num_queries
+):
+    """Тест числа запросов при создании, изменении и удалении комментария."""
+    with django_assert_num_queries(expected_queries):
+        response = author_client.post(urls[url_key], data=data)
+    assertRedirects(
+        response,
+        f'{urls['NEWS_DETAIL']}#comments',
+        fetch_redirect_response=False
+    )
+
+
+def test_write_behind_comment_queue(
+    settings, author_client, not_author_client, news, urls
+):
+    """Тест отложенной записи комментария через очередь."""
+    settings.COMMENT_WRITE_BEHIND = True
+    comments_count_before = Comment.objects.count()
+    response = author_client.post(urls['NEWS_DETAIL'], data=FORM_DATA)
+    assertRedirects(response, f'{urls['NEWS_DETAIL']}#comments')
+    assert Comment.objects.count() == comments_count_before
+    assert QueuedComment.objects.get().text == FORM_DATA['text']
+    assert FORM_DATA['text'] in author_client.get(
+        urls['NEWS_DETAIL']
+    ).content.decode()
+    assert FORM_DATA['text'] not in not_author_client.get(
+        urls['NEWS_DETAIL']
+    ).content.decode()
+    call_command('flush_comment_queue', once=True, stdout=StringIO())
+    assert not QueuedComment.objects.exists()
+    assert Comment.objects.latest('id').text == FORM_DATA['text']
+    news.refresh_from_db()
+    assert news.comment_count == comments_count_before + 1
+    assert FORM_DATA['text'] in not_author_client.get(
+        urls['NEWS_DETAIL']
+    ).content.decode()
+
+
+@pytest.mark.parametrize('url_key', ('NEWS_DETAIL', 'EDIT', 'DELETE'))
+def test_comment_writes_are_rate_limited(
+    url_key, settings, author_client, comment, urls,
+    django_assert_num_queries
+):
+    """Тест ответа 429 на запись комментариев сверх лимита."""
+    settings.COMMENT_RATE_LIMIT = (1, 60)
+    author_client.post(urls['EDIT'], data=FORM_DATA)
+    comments_count_before = Comment.objects.count()
+    # Лимит по IP проверяется раньше загрузки сессии и пользователя.
+    with django_assert_num_queries(0):
+        response = author_client.post(urls[url_key], data=FORM_DATA)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert 0 < int(response['Retry-After']) <= 60
+    assert Comment.objects.count() == comments_count_before
+    assert author_client.get(urls['EDIT']).status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    'proxy_hops, by_ip',
+    ((1, True), (0, False)),
+)
+def test_rate_limit_users_behind_one_address(
+    proxy_hops, by_ip, settings, author_client, not_author_client, urls
+):
+    """Тест: клиенты за одним прокси не делят лимит по IP."""
+    settings.COMMENT_RATE_LIMIT = (1, 60)
+    settings.TRUSTED_PROXY_HOPS = proxy_hops
+    settings.COMMENT_RATE_LIMIT_BY_IP = by_ip
+    proxy = {'REMOTE_ADDR': '10.0.0.1'}
+    response = author_client.post(
+        urls['NEWS_DETAIL'], data=FORM_DATA,
+        HTTP_X_FORWARDED_FOR='203.0.113.1', **proxy,
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    response = not_author_client.post(
+        urls['NEWS_DETAIL'], data=FORM_DATA,
+        HTTP_X_FORWARDED_FOR='203.0.113.2', **proxy,
+    )
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_rate_limit_ignores_spoofed_forwarded_addresses(
+    settings, author_client, not_author_client, urls
+):
+    """Тест: адреса левее доверенных прокси не меняют ведро IP."""
+    settings.COMMENT_RATE_LIMIT = (1, 60)
+    settings.TRUSTED_PROXY_HOPS = 1
+    for client, spoofed in (
+        (author_client, '1.1.1.1'), (not_author_client, '2.2.2.2')
+    ):
+        response = client.post(
+            urls['NEWS_DETAIL'], data=FORM_DATA,
+            HTTP_X_FORWARDED_FOR=f'{spoofed}, 203.0.113.1',
+        )
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_rate_limit_ignores_forwarded_header_without_proxy(
+    settings, author_client, not_author_client, urls
+):
+    """Тест: без доверенных прокси X-Forwarded-For не выбирает ведро IP."""
+    settings.COMMENT_RATE_LIMIT = (1, 60)
+    assert settings.TRUSTED_PROXY_HOPS == 0
+    for client, forwarded in (
+        (author_client, '203.0.113.1'), (not_author_client, '203.0.113.2')
+    ):
+        response = client.post(
+            urls['NEWS_DETAIL'], data=FORM_DATA,
+            HTTP_X_FORWARDED_FOR=forwarded,
+        )
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_rate_limit_is_per_user(
+    settings, author_client, not_author_client, urls
+):
+    """Тест отдельного лимита для каждого пользователя."""
+    settings.COMMENT_RATE_LIMIT = (2, 60)
+    for _ in range(2):
+        author_client.post(urls['NEWS_DETAIL'], data=FORM_DATA)
+    response = author_client.post(urls['NEWS_DETAIL'], data=FORM_DATA)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    response = not_author_client.post(
+        urls['NEWS_DETAIL'], data=FORM_DATA, REMOTE_ADDR='10.0.0.2'
+    )
+    assert response.status_code == HTTPStatus.FOUND
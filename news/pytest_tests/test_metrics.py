@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
+
+from news.metrics import registry
+from news.middleware import QueryRecorder, RequestMetricsMiddleware
+from news.models import News
+
+
+pytestmark = pytest.mark.django_db
+
+TOKEN = 'секрет'
+
+
+@pytest.fixture
+def metrics_url(settings):
+    """Фикстура для адреса метрик с заданным токеном."""
+    settings.METRICS_TOKEN = TOKEN
+    registry.clear()
+    yield reverse('metrics')
+    registry.clear()
+
+
+def test_metrics_require_token(metrics_url, client):
+    """Тест недоступности метрик без токена."""
+    response = client.get(metrics_url, HTTP_AUTHORIZATION='Bearer чужой')
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_metrics_by_view(metrics_url, author_client, urls):
+    """Тест метрик по представлениям в формате Prometheus."""
+    author_client.get(urls['HOME'])
+    author_client.get(urls['NEWS_DETAIL'])
+    author_client.post(urls['NEWS_DETAIL'], data={'text': 'Текст'})
+    response = author_client.get(
+        metrics_url, HTTP_AUTHORIZATION=f'Bearer {TOKEN}'
+    )
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode()
+    assert '# TYPE yanews_db_queries_total counter' in content
+    for view in ('NewsList', 'NewsDetail', 'NewsComment'):
+        assert f'yanews_requests_total{{view="{view}"}} 1' in content
+    assert 'yanews_db_queries_total{view="NewsList"} 0' not in content
+
+
+def test_metrics_middleware_runs_async(metrics_url, rf, news):
+    """Тест асинхронного режима middleware метрик и подсчёта запросов."""
+    async def get_response(request):
+        request._metrics_view = 'AsyncView'
+        await News.objects.acount()
+        await News.objects.afirst()
+        return HttpResponse()
+
+    middleware = RequestMetricsMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
+    assert iscoroutinefunction(middleware.process_template_response)
+    async_to_sync(middleware)(rf.get('/'))
+    assert registry.views['AsyncView']['db_queries_total'] == 2
+
+
+def test_query_recorder_flags_duplicates(news):
+    """Тест поиска повторяющихся запросов."""
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        for _ in range(3):
+            list(news.comment_set.all())
+    assert recorder.count == 3
+    assert list(recorder.duplicates.values()) == [3]
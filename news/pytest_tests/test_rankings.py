@@ -0,0 +1,112 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from news.archive import archive_batch
+from news.models import Comment, CommentBucket, News, RankingWatermark
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def discussed_news(author):
+    """Фикстура для новостей с разным числом свежих и старых комментариев."""
+    now = timezone.now()
+    quiet, busy, old = News.objects.bulk_create(
+        News(title=title, text='Текст')
+        for title in ('Тихая', 'Шумная', 'Старая')
+    )
+    Comment.objects.bulk_create(
+        [Comment(news=quiet, author=author, text='Раз', created=now)]
+        + [
+            Comment(news=busy, author=author, text='Два', created=now)
+            for _ in range(3)
+        ]
+        + [
+            Comment(
+                news=old, author=author, text='Три',
+                created=now - timedelta(hours=36),
+            )
+            for _ in range(5)
+        ]
+    )
+    return quiet, busy, old
+
+
+def refresh(*args):
+    call_command('refresh_rankings', *args, stdout=StringIO())
+
+
+def ranking_titles(client, ranking):
+    response = client.get(reverse('news:ranking', args=(ranking,)))
+    return [ranked.news.title for ranked in response.context['object_list']]
+
+
+def test_rankings(client, discussed_news):
+    """Тест рейтингов обсуждаемых за сутки, неделю и набирающих новостей."""
+    refresh()
+    assert ranking_titles(client, 'day') == ['Шумная', 'Тихая']
+    assert ranking_titles(client, 'week') == ['Старая', 'Шумная', 'Тихая']
+    assert ranking_titles(client, 'trending') == ['Шумная', 'Тихая', 'Старая']
+
+
+def test_rankings_refresh_incrementally(client, author, discussed_news):
+    """Тест учёта при обновлении только новых комментариев."""
+    quiet, busy, old = discussed_news
+    refresh()
+    Comment.objects.bulk_create(
+        Comment(news=quiet, author=author, text='Ещё') for _ in range(5)
+    )
+    refresh()
+    assert ranking_titles(client, 'day') == ['Тихая', 'Шумная']
+    total = sum(CommentBucket.objects.values_list('count', flat=True))
+    assert total == Comment.objects.count()
+    Comment.objects.filter(news=quiet).delete()
+    refresh('--full')
+    assert ranking_titles(client, 'day') == ['Шумная']
+
+
+def test_archiving_newest_bucket_keeps_watermark(
+    client, author, discussed_news
+):
+    """Тест: архив новости с последним комментарием не сдвигает отметку."""
+    quiet, busy, old = discussed_news
+    newest = News.objects.create(title='Последняя', text='Текст')
+    Comment.objects.create(news=newest, author=author, text='Последний')
+    refresh()
+    last_comment_id = Comment.objects.latest('pk').pk
+    News.objects.filter(pk=newest.pk).update(
+        date=timezone.localdate() - timedelta(days=400)
+    )
+    archive_batch(timezone.localdate() - timedelta(days=365), 10)
+    assert not CommentBucket.objects.filter(news=newest).exists()
+    refresh()
+    watermark = RankingWatermark.objects.get()
+    assert watermark.last_comment_id == last_comment_id
+    total = sum(CommentBucket.objects.values_list('count', flat=True))
+    assert total == Comment.objects.count()
+    Comment.objects.create(news=quiet, author=author, text='Новый')
+    refresh()
+    total = sum(CommentBucket.objects.values_list('count', flat=True))
+    assert total == Comment.objects.count()
+
+
+def test_ranking_page_single_query(
+    client, discussed_news, django_assert_num_queries
+):
+    """Тест вывода рейтинга одним запросом без агрегации комментариев."""
+    refresh()
+    with django_assert_num_queries(1) as queries:
+        client.get(reverse('news:ranking', args=('day',)))
+    assert 'news_comment' not in queries.captured_queries[0]['sql']
+
+
+def test_unknown_ranking(client):
+    """Тест ответа 404 на неизвестный рейтинг."""
+    response = client.get(reverse('news:ranking', args=('year',)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
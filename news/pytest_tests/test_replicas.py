@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.urls import reverse
+
+from news.middleware import PRIMARY_COOKIE, ReplicaPinMiddleware
+from news.models import News
+from news.routers import use_primary
+
+
+pytestmark = pytest.mark.django_db
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(db, settings, tmp_path):
+    """Фикстура для реплики: отдельного файла SQLite, отстающего от базы."""
+    connections.settings[REPLICA] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+        REPLICA: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': tmp_path / 'replica.sqlite3',
+        },
+    })[REPLICA]
+    # Реплики нет в DATABASES тестового класса, поэтому соединение
+    # открывается явно, в обход проверки ensure_connection.
+    connections[REPLICA].connect()
+    call_command('migrate', database=REPLICA, verbosity=0)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+def test_reads_go_to_replica(replica, news, client, urls):
+    """Тест чтения новостей с реплики."""
+    response = client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    News.objects.using(replica).create(
+        pk=news.pk, title='С реплики', text=news.text
+    )
+    response = client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['news'].title == 'С реплики'
+
+
+def test_reads_stick_to_primary_after_write(
+    replica, news, author_client, client, urls
+):
+    """Тест чтения с основной базы сразу после записи."""
+    response = author_client.post(urls['NEWS_DETAIL'], data={'text': 'Моё'})
+    assert response.status_code == HTTPStatus.FOUND
+    response = author_client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.OK
+    assert 'Моё' in response.content.decode()
+    response = client.get(urls['NEWS_DETAIL'])
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_version_cached_pages_read_primary(
+    replica, news, client, django_capture_on_commit_callbacks
+):
+    """
+    Тест: главная и ленты кешируются под версией, данные - с основной базы.
+
+    Иначе новость, ещё не дошедшая до реплики, не появилась бы
+    и после того, как реплика догонит основную базу.
+    """
+    home_url = reverse('news:home')
+    feed_url = reverse('news:feed', args=('rss',))
+    client.get(home_url)
+    client.get(feed_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        fresh = News.objects.create(title='Свежая новость', text='Текст')
+    for url in (home_url, feed_url):
+        assert fresh.title in client.get(url).content.decode()
+
+
+def test_replica_pin_middleware_async(rf):
+    """Тест закрепления за основной базой в асинхронной цепочке."""
+    seen = []
+
+    async def get_response(request):
+        seen.append(use_primary.get())
+        return HttpResponse()
+
+    middleware = ReplicaPinMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
+    response = async_to_sync(middleware)(rf.post('/'))
+    assert PRIMARY_COOKIE in response.cookies
+    async_to_sync(middleware)(rf.get('/'))
+    assert seen == [True, False]
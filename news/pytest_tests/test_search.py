@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from news.models import Comment
+
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Поиск работает на SQLite FTS5.'
+    ),
+]
+
+
+def search(client, query, **params):
+    response = client.get(reverse('news:search'), {'q': query, **params})
+    return response.context['results'], response.context['has_next']
+
+
+def test_search_news_and_comments(client, news, comment):
+    """Тест поиска по новостям и комментариям."""
+    results, _ = search(client, 'текст')
+    assert {(result['kind'], result['id']) for result in results} == {
+        ('news', news.id), ('comment', comment.id)
+    }
+
+
+def test_search_follows_changes(client, news, comment):
+    """Тест обновления индекса при изменении и удалении записей."""
+    comment.text = 'Совсем другие слова'
+    comment.save()
+    results, _ = search(client, 'другие')
+    assert [result['id'] for result in results] == [comment.id]
+    comment.delete()
+    assert search(client, 'другие') == ([], False)
+
+
+def test_search_ranks_and_paginates(client, settings, author, news):
+    """Тест сортировки по BM25 и постраничного вывода."""
+    settings.SEARCH_RESULTS_ON_PAGE = 2
+    comments = Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=text)
+        for text in ('редиска', 'редиска и ещё много разных слов вокруг',
+                     'редиска редиска')
+    )
+    results, has_next = search(client, 'редис')
+    assert [result['id'] for result in results] == [
+        comments[2].id, comments[0].id
+    ]
+    assert has_next
+    results, has_next = search(client, 'редис', page=2)
+    assert [result['id'] for result in results] == [comments[1].id]
+    assert not has_next
+
+
+def test_search_page_out_of_range(client, comment):
+    """Тест пустой страницы вместо ошибки для огромного номера."""
+    assert search(client, 'комментария', page='9' * 23) == ([], False)
+
+
+def test_search_escapes_snippets(client, author, news):
+    """Тест экранирования текста в результатах поиска."""
+    Comment.objects.create(news=news, author=author, text='<b>жирный</b>')
+    response = client.get(reverse('news:search'), {'q': 'жирный "'})
+    content = response.content.decode()
+    assert '&lt;b&gt;<mark>жирный</mark>&lt;/b&gt;' in content
+
+
+def test_rebuild_search_index(client, news):
+    """Тест перестроения индекса командой."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO news_news_fts(news_news_fts) VALUES ('delete-all')"
+        )
+    assert search(client, 'заголовок') == ([], False)
+    call_command('rebuild_search_index', stdout=StringIO())
+    results, _ = search(client, 'заголовок')
+    assert [result['id'] for result in results] == [news.id]
@@ -0,0 +1,135 @@
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+
+from news import snapshots
+from news.middleware import NewsSnapshotMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def snapshot_root(settings, tmp_path):
+    """Фикстура для каталога снимков страниц новостей."""
+    settings.NEWS_SNAPSHOT_ROOT = tmp_path
+    return tmp_path
+
+
+def build(**options):
+    call_command(
+        'build_news_snapshots', once=True, stdout=StringIO(), **options
+    )
+
+
+def test_anonymous_reader_gets_snapshot(
+    snapshot_root, news, comment, client, urls, django_assert_num_queries
+):
+    """Тест отдачи снимка анонимному читателю без запросов к базе."""
+    build(all=True)
+    snapshot = (snapshot_root / f'{news.pk}.html').read_bytes()
+    assert news.title.encode() in snapshot
+    assert comment.text.encode() in snapshot
+    with django_assert_num_queries(0):
+        response = client.get(urls['NEWS_DETAIL'])
+    assert response.content == snapshot
+    assert 'Cookie' in response['Vary']
+
+
+def test_logged_in_reader_gets_live_page(
+    snapshot_root, news, author_client, urls
+):
+    """Тест живой страницы с формой для пользователя с сессией."""
+    build(all=True)
+    response = author_client.get(urls['NEWS_DETAIL'])
+    assert 'form' in response.context
+
+
+def test_comment_invalidates_snapshot(
+    snapshot_root, news, author_client, client, urls,
+    django_capture_on_commit_callbacks,
+):
+    """Тест удаления и новой отрисовки снимка после комментария."""
+    build(all=True)
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(urls['NEWS_DETAIL'], data={'text': 'Свежий'})
+    assert not (snapshot_root / f'{news.pk}.html').exists()
+    assert 'Свежий' in client.get(urls['NEWS_DETAIL']).content.decode()
+    build()
+    assert 'Свежий' in (snapshot_root / f'{news.pk}.html').read_text()
+
+
+def test_snapshot_invalidated_after_commit(
+    snapshot_root, news, django_capture_on_commit_callbacks
+):
+    """Тест: снимок сбрасывается только после фиксации транзакции."""
+    build(all=True)
+    with django_capture_on_commit_callbacks() as callbacks:
+        news.title = 'Новый заголовок'
+        news.save()
+    assert (snapshot_root / f'{news.pk}.html').exists()
+    for callback in callbacks:
+        callback()
+    assert not (snapshot_root / f'{news.pk}.html').exists()
+    assert (snapshot_root / f'{news.pk}.dirty').exists()
+
+
+def test_snapshot_middleware_async(snapshot_root, news, comment, rf, urls):
+    """Тест отдачи снимка в асинхронной цепочке middleware."""
+    build(all=True)
+
+    async def get_response(request):
+        raise AssertionError('Запрос должен обслужить снимок.')
+
+    middleware = NewsSnapshotMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
+    response = async_to_sync(middleware)(rf.get(urls['NEWS_DETAIL']))
+    assert response.content == (
+        snapshot_root / f'{news.pk}.html'
+    ).read_bytes()
+
+
+def test_snapshot_changed_during_render_is_discarded(
+    snapshot_root, news, monkeypatch
+):
+    """Тест отказа от снимка, устаревшего за время отрисовки."""
+    render = snapshots.render_snapshot
+
+    def render_and_change(pk):
+        content = render(pk)
+        snapshots.invalidate_snapshot(pk)
+        return content
+
+    monkeypatch.setattr(snapshots, 'render_snapshot', render_and_change)
+    assert not snapshots.build_snapshot(news.pk)
+    assert not (snapshot_root / f'{news.pk}.html').exists()
+    assert not list(snapshot_root.glob('*.tmp'))
+
+
+def test_pass_renders_only_invalidated_snapshots(
+    snapshot_root, news, django_assert_num_queries
+):
+    """Тест: обычный проход не перебирает новости без меток."""
+    build(all=True)
+    with django_assert_num_queries(0):
+        assert snapshots.build_snapshots() == 0
+    snapshots.invalidate_snapshot(news.pk)
+    assert snapshots.build_snapshots() == 1
+    assert (snapshot_root / f'{news.pk}.html').exists()
+    assert not (snapshot_root / f'{news.pk}.dirty').exists()
+
+
+def test_marker_of_deleted_news_is_removed(snapshot_root):
+    """Тест снятия метки удалённой новости."""
+    snapshots.invalidate_snapshot(0)
+    assert snapshots.build_snapshots() == 0
+    assert not (snapshot_root / '0.dirty').exists()
+
+
+def test_snapshot_request_uses_allowed_host(settings):
+    """Тест адреса сервера запроса для отрисовки снимка."""
+    settings.ALLOWED_HOSTS = ['.example.com', 'news.example.com']
+    request = snapshots.snapshot_request('/news/1/')
+    assert request.get_host() == 'news.example.com'
+    assert request.user.is_anonymous
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ALIAS = 'production'
+
+
+def test_sqlite_production_profile_pragmas(db, tmp_path):
+    """Тест настроек соединения в профиле SQLite для продакшена."""
+    connections.settings[ALIAS] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+        ALIAS: {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': tmp_path / 'production.sqlite3',
+            **settings.SQLITE_PRODUCTION,
+        },
+    })[ALIAS]
+    connection = connections[ALIAS]
+    try:
+        # Псевдонима нет в базах теста, соединение открывается явно.
+        connection.connect()
+        pragmas = {
+            pragma: connection.connection.execute(
+                f'PRAGMA {pragma}'
+            ).fetchone()[0]
+            for pragma in ('journal_mode', 'synchronous', 'busy_timeout')
+        }
+        assert pragmas == {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 20000,
+        }
+        assert connection.transaction_mode == 'IMMEDIATE'
+        assert connection.settings_dict['CONN_HEALTH_CHECKS']
+    finally:
+        connection.close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
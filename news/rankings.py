@@ -0,0 +1,135 @@
+"""
+Рейтинги новостей: самые обсуждаемые и набирающие обсуждение.
+
+Команда refresh_rankings периодически дополняет почасовые счётчики
+комментариев (CommentBucket) новыми комментариями и заново строит
+короткие готовые рейтинги (RankedNews). Страница рейтинга читает
+одну таблицу по индексу и не агрегирует комментарии.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Comment, CommentBucket, RankedNews, RankingWatermark
+from .routers import use_primary
+
+RANKINGS = {
+    'day': 'Обсуждаемое за сутки',
+    'week': 'Обсуждаемое за неделю',
+    'trending': 'Набирает обсуждение',
+}
+# Счётчики старше самого длинного окна рейтинга не нужны.
+KEEP = timedelta(days=7)
+TRENDING_WINDOW = timedelta(hours=48)
+# Вклад комментария в «набирает обсуждение» вдвое меньше каждые 6 часов.
+TRENDING_HALF_LIFE = timedelta(hours=6)
+
+
+def refresh_buckets(now, full=False):
+    """
+    Добавляем в счётчики комментарии, появившиеся после прошлого раза.
+
+    Новые комментарии выбираются по первичному ключу после отметки
+    RankingWatermark. Удалённые комментарии не вычитаются: их учтёт
+    полная пересборка (full=True). Возвращаем число учтённых комментариев.
+    """
+    since = now - KEEP
+    watermark, _ = RankingWatermark.objects.select_for_update().get_or_create(
+        pk=1
+    )
+    if full:
+        CommentBucket.objects.all().delete()
+        watermark.last_comment_id = 0
+    rows = list(Comment.objects.filter(
+        pk__gt=watermark.last_comment_id, created__gte=since
+    ).annotate(hour=TruncHour('created')).order_by().values(
+        'news_id', 'hour'
+    ).annotate(count=Count('pk'), last_comment_id=Max('pk')))
+    if rows:
+        buckets = {
+            (bucket.news_id, bucket.hour): bucket
+            for bucket in CommentBucket.objects.filter(
+                hour__gte=min(row['hour'] for row in rows)
+            )
+        }
+        for row in rows:
+            key = row['news_id'], row['hour']
+            bucket = buckets.setdefault(
+                key, CommentBucket(news_id=row['news_id'], hour=row['hour'])
+            )
+            bucket.count += row['count']
+        CommentBucket.objects.bulk_create(
+            buckets.values(),
+            update_conflicts=True,
+            unique_fields=('news', 'hour'),
+            update_fields=('count',),
+        )
+        watermark.last_comment_id = max(
+            row['last_comment_id'] for row in rows
+        )
+    watermark.save()
+    CommentBucket.objects.filter(hour__lt=since).delete()
+    return sum(row['count'] for row in rows)
+
+
+def most_discussed(since, size):
+    return [
+        (row['news_id'], row['total'])
+        for row in CommentBucket.objects.filter(hour__gte=since).values(
+            'news_id'
+        ).annotate(total=Sum('count')).order_by('-total', '-news_id')[:size]
+    ]
+
+
+def trending(now, size):
+    """Новости с наибольшим числом комментариев с затуханием по времени."""
+    scores = {}
+    for news_id, hour, count in CommentBucket.objects.filter(
+        hour__gte=now - TRENDING_WINDOW
+    ).values_list('news_id', 'hour', 'count'):
+        weight = 0.5 ** ((now - hour) / TRENDING_HALF_LIFE)
+        scores[news_id] = scores.get(news_id, 0) + count * weight
+    return sorted(
+        scores.items(), key=lambda item: (-item[1], -item[0])
+    )[:size]
+
+
+def refresh_rankings(full=False):
+    """Обновляем счётчики и перестраиваем все рейтинги."""
+    now = timezone.now()
+    size = settings.RANKING_NEWS_COUNT
+    token = use_primary.set(True)
+    try:
+        with transaction.atomic():
+            counted = refresh_buckets(now, full)
+            rankings = {
+                'day': most_discussed(now - timedelta(days=1), size),
+                'week': most_discussed(now - KEEP, size),
+                'trending': trending(now, size),
+            }
+            RankedNews.objects.all().delete()
+            RankedNews.objects.bulk_create(
+                RankedNews(
+                    ranking=ranking, position=position,
+                    news_id=news_id, score=score,
+                )
+                for ranking, ranked in rankings.items()
+                for position, (news_id, score) in enumerate(ranked, 1)
+            )
+    finally:
+        use_primary.reset(token)
+    return counted
+
+
+def ranked_news(ranking):
+    """Новости рейтинга по порядку - чтение по уникальному индексу."""
+    return RankedNews.objects.filter(ranking=ranking).select_related(
+        'news'
+    ).only(
+        'position', 'score', 'news__title', 'news__date', 'news__excerpt',
+        'news__comment_count',
+    ).order_by('position')
@@ -0,0 +1,99 @@
+"""
+Ограничение частоты запросов на запись.
+
+Ведро токенов (token bucket) хранится в кеше Django парой
+(токены, время обновления): проверка - одно чтение и одна запись
+кеша, без обращений к базе.
+"""
+import math
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .middleware import SAFE_METHODS
+
+RATE_LIMIT_KEY = 'ratelimit:{scope}:{ident}'
+
+
+def take_token(key, capacity, period):
+    """
+    Забираем токен из ведра; возвращаем 0 или сколько секунд ждать.
+
+    Ведро вмещает capacity токенов и наполняется целиком за period
+    секунд, поэтому ключ живёт в кеше не дольше period. Чтение и запись
+    не атомарны: при гонке может пройти лишний запрос, для защиты
+    от потока записей это допустимо.
+    """
+    now = time.time()
+    rate = capacity / period
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens < 1:
+        return math.ceil((1 - tokens) / rate)
+    cache.set(key, (tokens - 1, now), math.ceil(period))
+    return 0
+
+
+def client_ip(request):
+    """
+    Адрес клиента для лимита по IP.
+
+    За обратным прокси REMOTE_ADDR - адрес прокси, общий для всех
+    клиентов. Каждый из TRUSTED_PROXY_HOPS доверенных прокси дописывает
+    в X-Forwarded-For адрес, с которого к нему пришли, поэтому клиент -
+    столько-то адресов с конца; адреса левее клиент мог подделать.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    forwarded = request.headers.get('X-Forwarded-For')
+    if hops and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(hops, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def too_many_requests(retry_after):
+    return HttpResponse(
+        'Слишком много запросов, попробуйте позже.',
+        status=HTTPStatus.TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(retry_after)},
+    )
+
+
+class RateLimitMixin:
+    """
+    Ограничивает запросы на запись отдельно по IP и по пользователю.
+
+    Лимит задаётся в настройке COMMENT_RATE_LIMIT парой (запросов,
+    секунд). Проверка идёт до формы и ORM; IP проверяется первым,
+    ещё до загрузки пользователя из сессии. Лимит по IP отключается
+    настройкой COMMENT_RATE_LIMIT_BY_IP.
+    """
+    rate_limit_scope = 'comment'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS and settings.COMMENT_RATE_LIMIT:
+            retry_after = self.check_rate_limit(request)
+            if retry_after:
+                return too_many_requests(retry_after)
+        return super().dispatch(request, *args, **kwargs)
+
+    def check_rate_limit(self, request):
+        capacity, period = settings.COMMENT_RATE_LIMIT
+        retry_after = 0
+        if settings.COMMENT_RATE_LIMIT_BY_IP:
+            retry_after = take_token(
+                self.get_rate_limit_key(f'ip:{client_ip(request)}'),
+                capacity, period,
+            )
+        if retry_after or not request.user.is_authenticated:
+            return retry_after
+        return take_token(
+            self.get_rate_limit_key(f'user:{request.user.pk}'),
+            capacity, period,
+        )
+
+    def get_rate_limit_key(self, ident):
+        return RATE_LIMIT_KEY.format(scope=self.rate_limit_scope, ident=ident)
@@ -0,0 +1,21 @@
+"""
+Заранее подготовленные представления текстов.
+
+Отрывок новости для главной страницы и HTML комментария считаются
+при сохранении, а не при каждой отрисовке шаблона. Записи через
+bulk_create минуют сигналы и заполняют эти поля сами.
+"""
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 15
+
+
+def make_excerpt(text):
+    """То же, что фильтр truncatewords:15."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def render_text(text):
+    """То же, что фильтр linebreaksbr с экранированием."""
+    return linebreaksbr(text, autoescape=True)
@@ -0,0 +1,49 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+
+# Читать только с основной базы: запрос на запись или пользователь,
+# который только что писал и должен сразу увидеть свои изменения.
+use_primary = ContextVar('use_primary', default=False)
+
+
+def read_primary(queryset):
+    """
+    Запрос с основной базы для данных, которые кешируются под версией.
+
+    Версию сдвигает запись в основную базу. Прочитанное после этого
+    с отстающей реплики легло бы в кеш под новой версией и осталось
+    бы там до следующей записи.
+    """
+    return queryset.using(router.db_for_write(queryset.model))
+
+
+class ReplicaRouter:
+    """
+    Чтение данных новостей с реплик, запись - в основную базу.
+
+    Реплики перечисляются в настройке DATABASE_REPLICAS. Сессии
+    и пользователи всегда читаются с основной базы, чтобы отставание
+    реплики не разлогинивало пользователей.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            replicas
+            and model._meta.app_label == 'news'
+            and not use_primary.get()
+        ):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
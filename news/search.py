@@ -0,0 +1,194 @@
+"""
+Полнотекстовый поиск по новостям и комментариям на SQLite FTS5.
+
+Индексы - внешние (external content) таблицы FTS5 над news_news
+и news_comment; триггеры обновляют их при любой записи, в том
+числе через bulk_create и миграции данных.
+"""
+import re
+
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Comment, News
+
+TOKENIZER = 'unicode61 remove_diacritics 2'
+INDEXES = {
+    # Таблица FTS: (таблица с данными, индексируемые столбцы).
+    'news_news_fts': ('news_news', ('title', 'text')),
+    'news_comment_fts': ('news_comment', ('text',)),
+}
+WORD = re.compile(r'\w+')
+SNIPPET_WORDS = 24
+
+# Ранжируются только самые свежие совпадения в каждой таблице: BM25
+# для всех совпадений частого слова на миллионе строк стоит секунды.
+RANK_SQL = '''
+    SELECT kind, id FROM (
+        SELECT 'news' AS kind, id, rank FROM (
+            SELECT rowid AS id, bm25(news_news_fts, 5.0, 1.0) AS rank
+            FROM news_news_fts WHERE news_news_fts MATCH %s
+            ORDER BY rowid DESC LIMIT %s
+        )
+        UNION ALL
+        SELECT 'comment', id, rank FROM (
+            SELECT rowid AS id, bm25(news_comment_fts) AS rank
+            FROM news_comment_fts WHERE news_comment_fts MATCH %s
+            ORDER BY rowid DESC LIMIT %s
+        )
+    )
+    ORDER BY rank
+    LIMIT %s OFFSET %s
+'''
+
+
+def install_search_index(connection):
+    """
+    Создаём таблицы FTS и триггеры, если их нет.
+
+    SQLite удаляет триггеры, когда миграция пересоздаёт таблицу,
+    поэтому установка повторяется после каждой миграции.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for fts, (table, columns) in INDEXES.items():
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            insert = (
+                f'INSERT INTO {fts}(rowid, {column_list}) '
+                f'VALUES (new.id, {new_values});'
+            )
+            delete = (
+                f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+                f"VALUES ('delete', old.id, {old_values});"
+            )
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5('
+                f"{column_list}, content='{table}', content_rowid='id', "
+                f"tokenize='{TOKENIZER}')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_insert '
+                f'AFTER INSERT ON {table} BEGIN {insert} END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_delete '
+                f'AFTER DELETE ON {table} BEGIN {delete} END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_update '
+                f'AFTER UPDATE OF {column_list} ON {table} '
+                f'BEGIN {delete} {insert} END'
+            )
+
+
+def drop_search_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for fts in INDEXES:
+            for action in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{action}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def rebuild_search_index(connection):
+    """Перестраиваем индексы FTS по текущим данным таблиц."""
+    if connection.vendor != 'sqlite':
+        return
+    install_search_index(connection)
+    with connection.cursor() as cursor:
+        for fts in INDEXES:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def build_match(query):
+    """
+    Превращаем запрос пользователя в безопасное выражение FTS5.
+
+    Каждое слово ищется как префикс, чтобы находить словоформы;
+    все слова должны встретиться в документе.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD.findall(query.lower()))
+
+
+def make_snippet(text, words):
+    """
+    Фрагмент текста вокруг первого совпадения с подсвеченными словами.
+
+    Функция snippet() из FTS5 для префиксных запросов заново читает
+    весь список документов слова, поэтому фрагменты строятся здесь,
+    только для строк найденной страницы.
+    """
+    tokens = list(WORD.finditer(text))
+    if not tokens:
+        return escape(text)
+    matches = [
+        index for index, token in enumerate(tokens)
+        if token.group().lower().startswith(words)
+    ]
+    first = matches[0] if matches else 0
+    start = max(
+        min(first - SNIPPET_WORDS // 4, len(tokens) - SNIPPET_WORDS), 0
+    )
+    window = tokens[start:start + SNIPPET_WORDS]
+    parts = ['…'] if start else []
+    position = window[0].start() if start else 0
+    for token in window:
+        parts.append(escape(text[position:token.start()]))
+        word = escape(token.group())
+        if token.group().lower().startswith(words):
+            word = f'<mark>{word}</mark>'
+        parts.append(word)
+        position = token.end()
+    if start + SNIPPET_WORDS < len(tokens):
+        parts.append('…')
+    else:
+        parts.append(escape(text[position:]))
+    return mark_safe(''.join(parts))
+
+
+def search(connection, query, page=1):
+    """
+    Страница результатов поиска, отсортированных по BM25.
+
+    Возвращаем результаты и признак следующей страницы. Каждая
+    таблица даёт не больше SEARCH_RANK_LIMIT совпадений, поэтому
+    страницы дальше последней возможной пусты без запроса к базе:
+    слишком большое смещение не помещается в целое SQLite.
+    """
+    match = build_match(query)
+    page_size = settings.SEARCH_RESULTS_ON_PAGE
+    rank_limit = settings.SEARCH_RANK_LIMIT
+    if not match or page > 2 * rank_limit // page_size + 1:
+        return [], False
+    with connection.cursor() as cursor:
+        cursor.execute(RANK_SQL, [
+            match, rank_limit, match, rank_limit,
+            page_size + 1, (page - 1) * page_size,
+        ])
+        hits = cursor.fetchall()
+    has_next = len(hits) > page_size
+    hits = hits[:page_size]
+    words = tuple(WORD.findall(query.lower()))
+    found = {}
+    news_ids = [pk for kind, pk in hits if kind == 'news']
+    for pk, title, text in News.objects.filter(
+        pk__in=news_ids
+    ).values_list('pk', 'title', 'text'):
+        found['news', pk] = {
+            'kind': 'news', 'id': pk, 'news_id': pk, 'title': title,
+            'snippet': make_snippet(text, words),
+        }
+    comment_ids = [pk for kind, pk in hits if kind == 'comment']
+    for pk, news_id, title, text in Comment.objects.filter(
+        pk__in=comment_ids
+    ).values_list('pk', 'news_id', 'news__title', 'text'):
+        found['comment', pk] = {
+            'kind': 'comment', 'id': pk, 'news_id': news_id, 'title': title,
+            'snippet': make_snippet(text, words),
+        }
+    return [found[hit] for hit in hits if hit in found], has_next
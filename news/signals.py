@@ -0,0 +1,117 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authors import display_names
+from .cache import bump_feed_version, bump_home_version, bump_news_version
+from .dates import refresh_day_counts, skip_day_counts
+from .models import Comment, News
+from .rendering import make_excerpt, render_text
+from .routers import read_primary
+from .snapshots import invalidate_snapshot
+
+
+@receiver(pre_save, sender=News)
+def render_news(sender, instance, **kwargs):
+    """Главная страница выводит отрывок, не загружая полный текст."""
+    instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=News)
+def remember_news_date(sender, instance, raw, **kwargs):
+    """При смене даты новости нужно пересчитать и прежний день."""
+    if instance.pk is not None and not raw:
+        instance._previous_date = read_primary(
+            News.objects.filter(pk=instance.pk)
+        ).values_list('date', flat=True).first()
+
+
+@receiver(pre_save, sender=Comment)
+def render_comment(sender, instance, **kwargs):
+    """Комментарий выводится готовым HTML, без фильтров при отрисовке."""
+    instance.text_html = render_text(instance.text)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw, **kwargs):
+    """Новый комментарий увеличивает счётчик у новости."""
+    if created and not raw:
+        News.objects.filter(pk=instance.news_id).change_comment_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Удалённый комментарий уменьшает счётчик у новости."""
+    News.objects.filter(
+        pk=instance.news_id, comment_count__gt=0
+    ).change_comment_count(-1)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_home_page(sender, using, **kwargs):
+    """
+    Любое изменение новостей и комментариев меняет главную страницу.
+
+    Версии кешей сдвигаются после фиксации транзакции: иначе
+    параллельный запрос закеширует ещё старые строки под новой версией.
+    """
+    transaction.on_commit(bump_home_version, using=using)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_news_page(sender, instance, using, **kwargs):
+    transaction.on_commit(partial(bump_news_version, instance.pk), using=using)
+    # До фиксации сборщик снимков отрисовал бы ещё старые строки.
+    transaction.on_commit(
+        partial(invalidate_snapshot, instance.pk), using=using
+    )
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_feeds(sender, using, **kwargs):
+    """Ленты не выводят комментарии, их меняет только запись новостей."""
+    transaction.on_commit(bump_feed_version, using=using)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def update_day_counts(sender, instance, using, **kwargs):
+    """
+    Счётчики навигации по датам (news.dates).
+
+    Дни пересчитываются после фиксации транзакции: до неё параллельная
+    запись того же дня посчитала бы новости без этой.
+    """
+    if skip_day_counts.get():
+        return
+    dates = {instance.date, getattr(instance, '_previous_date', None)}
+    transaction.on_commit(
+        partial(refresh_day_counts, dates - {None}), using=using
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_news_page(sender, instance, using, **kwargs):
+    """Правка комментария не меняет дату новости, но меняет страницу."""
+    transaction.on_commit(
+        partial(bump_news_version, instance.news_id), using=using
+    )
+    transaction.on_commit(
+        partial(invalidate_snapshot, instance.news_id), using=using
+    )
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_display_name(sender, instance, **kwargs):
+    """Имя автора в комментариях берётся из кеша news.authors."""
+    display_names.invalidate(instance.pk)
@@ -0,0 +1,124 @@
+"""
+Готовые HTML-снимки страниц новостей для анонимных читателей.
+
+Снимок - страница новости, отрисованная для анонимного пользователя
+и сохранённая в NEWS_SNAPSHOT_ROOT/<pk>.html. NewsSnapshotMiddleware
+отдаёт её с диска без обращений к базе. Любая запись новости или
+её комментариев удаляет снимок и оставляет метку <pk>.dirty, а команда
+build_news_snapshots заново отрисовывает помеченные снимки.
+"""
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpRequest
+from django.urls import reverse
+
+from .models import News
+from .routers import use_primary
+
+
+def snapshot_root():
+    return Path(settings.NEWS_SNAPSHOT_ROOT)
+
+
+def snapshot_path(pk):
+    return snapshot_root() / f'{pk}.html'
+
+
+def dirty_path(pk):
+    return snapshot_root() / f'{pk}.dirty'
+
+
+def invalidate_snapshot(pk):
+    """Удаляем снимок и помечаем, что страница изменилась."""
+    if not settings.NEWS_SNAPSHOT_ROOT:
+        return
+    snapshot_root().mkdir(parents=True, exist_ok=True)
+    dirty_path(pk).touch()
+    snapshot_path(pk).unlink(missing_ok=True)
+
+
+def invalidate_all_snapshots():
+    if not settings.NEWS_SNAPSHOT_ROOT or not snapshot_root().exists():
+        return
+    for path in snapshot_root().glob('*.html'):
+        invalidate_snapshot(path.stem)
+
+
+def snapshot_request(path):
+    """GET-запрос анонимного пользователя к первому из ALLOWED_HOSTS."""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    hosts = [
+        host for host in settings.ALLOWED_HOSTS
+        if not host.startswith(('.', '*'))
+    ]
+    request.META['SERVER_NAME'] = hosts[0] if hosts else 'localhost'
+    request.META['SERVER_PORT'] = '80'
+    request.user = AnonymousUser()
+    return request
+
+
+def render_snapshot(pk):
+    """HTML страницы новости для анонимного пользователя или None."""
+    # news.views импортирует news.queue, а тот - этот модуль.
+    from .views import NewsDetail
+
+    request = snapshot_request(reverse('news:detail', args=(pk,)))
+    try:
+        response = NewsDetail.as_view()(request, pk=pk)
+    except Http404:
+        return None
+    return response.render().content
+
+
+def build_snapshot(pk):
+    """
+    Отрисовываем и сохраняем снимок новости.
+
+    Метка изменения снимается до отрисовки. Если за время отрисовки
+    она появилась снова, снимок уже устарел и не сохраняется: его
+    отрисует следующий проход. Возвращаем, сохранён ли снимок.
+    """
+    dirty_path(pk).unlink(missing_ok=True)
+    content = render_snapshot(pk)
+    if content is None:
+        return False
+    temporary = snapshot_root() / f'.{pk}.{os.getpid()}.tmp'
+    temporary.write_bytes(content)
+    if dirty_path(pk).exists():
+        temporary.unlink()
+        return False
+    os.replace(temporary, snapshot_path(pk))
+    return True
+
+
+def build_snapshots(rebuild=False):
+    """
+    Отрисовываем снимки с меткой изменения; rebuild - снимки всех новостей.
+
+    Любая запись новости оставляет метку, поэтому обычный проход не
+    перебирает таблицу новостей. Метки удалённых новостей снимает
+    build_snapshot. Возвращаем число сохранённых снимков.
+    """
+    root = snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    built = 0
+    token = use_primary.set(True)
+    try:
+        if rebuild:
+            news_ids = News.objects.order_by('pk').values_list(
+                'pk', flat=True
+            ).iterator()
+        else:
+            news_ids = sorted(
+                (path.stem for path in root.glob('*.dirty')), key=int
+            )
+        for pk in news_ids:
+            built += build_snapshot(pk)
+    finally:
+        use_primary.reset(token)
+    return built
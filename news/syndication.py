@@ -0,0 +1,142 @@
+"""
+Ленты новостей для агрегаторов: RSS, Atom и JSON Feed.
+
+Лента собирается один раз из того же запроса, что и главная страница,
+и хранится в кеше готовыми байтами вместе со сжатой gzip копией
+и ETag. Ключ содержит версию лент, которая меняется только при записи
+новостей, поэтому опрос ленты - одно чтение кеша без шаблонов и базы.
+"""
+import gzip
+import hashlib
+import json
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import feedgenerator, timezone
+
+from .cache import get_feed_version
+
+# Ленты содержат абсолютные ссылки, поэтому ключ включает схему и хост.
+FEED_KEY = 'news:feed:{format}:{scheme}:{host}:{version}'
+FEED_TITLE = 'YaNews'
+FEED_DESCRIPTION = 'Последние новости'
+FEED_GENERATORS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+}
+JSON_FEED_TYPE = 'application/feed+json; charset=utf-8'
+FORMATS = (*FEED_GENERATORS, 'json')
+
+
+def news_items(request, queryset):
+    """Новости в виде, общем для всех форматов."""
+    for news in queryset:
+        yield {
+            'title': news.title,
+            'link': request.build_absolute_uri(
+                reverse('news:detail', args=(news.pk,))
+            ),
+            'description': news.excerpt,
+            'published': timezone.make_aware(
+                datetime.combine(news.date, time.min)
+            ),
+        }
+
+
+def build_xml_feed(request, format, queryset):
+    feed = FEED_GENERATORS[format](
+        title=FEED_TITLE,
+        link=request.build_absolute_uri(reverse('news:home')),
+        description=FEED_DESCRIPTION,
+        language=settings.LANGUAGE_CODE,
+        feed_url=request.build_absolute_uri(request.path),
+    )
+    for item in news_items(request, queryset):
+        feed.add_item(
+            title=item['title'],
+            link=item['link'],
+            description=item['description'],
+            unique_id=item['link'],
+            pubdate=item['published'],
+        )
+    return feed.writeString('utf-8').encode(), feed.content_type
+
+
+def build_json_feed(request, queryset):
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': FEED_TITLE,
+        'description': FEED_DESCRIPTION,
+        'home_page_url': request.build_absolute_uri(reverse('news:home')),
+        'feed_url': request.build_absolute_uri(request.path),
+        'language': settings.LANGUAGE_CODE,
+        'items': [
+            {
+                'id': item['link'],
+                'url': item['link'],
+                'title': item['title'],
+                'content_text': item['description'],
+                'date_published': item['published'].isoformat(),
+            }
+            for item in news_items(request, queryset)
+        ],
+    }
+    return json.dumps(feed, ensure_ascii=False).encode(), JSON_FEED_TYPE
+
+
+def build_feed(request, format, queryset):
+    """Готовая лента: байты, они же в gzip, тип содержимого и ETag."""
+    if format == 'json':
+        body, content_type = build_json_feed(request, queryset)
+    else:
+        body, content_type = build_xml_feed(request, format, queryset)
+    return {
+        'body': body,
+        'gzip': gzip.compress(body, mtime=0),
+        'content_type': content_type,
+        # Сжатая и несжатая ленты равнозначны, поэтому ETag слабый.
+        'etag': f'W/"{hashlib.md5(body).hexdigest()}"',
+    }
+
+
+def get_feed(request, format, queryset):
+    """
+    Ленту из кеша, а если её там нет - собираем и кладём в кеш.
+
+    Запрос новостей ленивый и выполняется только при сборке.
+    """
+    key = FEED_KEY.format(
+        format=format,
+        scheme=request.scheme,
+        host=request.get_host(),
+        version=get_feed_version(),
+    )
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_feed(request, format, queryset)
+        cache.set(key, feed, settings.FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Принимает ли клиент gzip по заголовку Accept-Encoding.
+
+    Учитываются q-значения: «gzip;q=0» - отказ от gzip, а «*» действует
+    только если gzip не назван явно.
+    """
+    qualities = {}
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        qualities[name.strip().lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0)) > 0
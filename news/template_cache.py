@@ -0,0 +1,30 @@
+"""
+Прогрев кеша шаблонов при запуске процесса.
+
+Кеширующий загрузчик находит и разбирает шаблон при первом обращении,
+то есть на первом запросе к каждой странице в каждом процессе. Прогрев
+делает это заранее для всех шаблонов проекта: страниц news/
+и registration/, base.html и частей из includes/.
+"""
+from pathlib import Path
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+
+def project_template_names(directory):
+    for path in sorted(Path(directory).rglob('*.html')):
+        yield path.relative_to(directory).as_posix()
+
+
+def warm_template_cache():
+    """Загружаем шаблоны из DIRS в кеш загрузчика; возвращаем их число."""
+    warmed = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for directory in backend.engine.dirs:
+            for name in project_template_names(directory):
+                backend.get_template(name)
+                warmed += 1
+    return warmed
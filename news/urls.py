@@ -1,16 +1,53 @@
+from django.conf import settings
 from django.urls import path
 
 from news import views
 
 app_name = 'news'
 
+# Под ASGI-сервером список и страница новости могут работать асинхронно.
+if settings.NEWS_ASYNC_VIEWS:
+    news_list = views.AsyncNewsList.as_view()
+    news_detail = views.AsyncNewsDetailView.as_view()
+else:
+    news_list = views.NewsList.as_view()
+    news_detail = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', news_list, name='home'),
+    path('news/<int:pk>/', news_detail, name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsCommentList.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('feed/<slug:format>/', views.NewsFeed.as_view(), name='feed'),
+    path('dates/', views.NewsDates.as_view(), name='dates'),
+    path(
+        'dates/<int:year>/',
+        views.NewsDates.as_view(),
+        name='dates_year'
+    ),
+    path(
+        'dates/<int:year>/<int:month>/',
+        views.NewsDates.as_view(),
+        name='dates_month'
+    ),
+    path(
+        'dates/<int:year>/<int:month>/<int:day>/',
+        views.NewsDates.as_view(),
+        name='dates_day'
+    ),
+    path(
+        'top/<slug:ranking>/',
+        views.NewsRanking.as_view(),
+        name='ranking'
+    ),
 ]
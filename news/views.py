@@ -1,49 +1,201 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.http import Http404, HttpResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .archive import aarchived_news, archived_news
+from .cache import get_home_version
+from .conditional import (
+    aget_news_state, news_detail_etag, news_detail_last_modified,
+    news_list_etag, news_list_last_modified
+)
+from .dates import (
+    CHILD_LEVELS, PERIOD_FORMATS, child_counts, get_period, period_total
+)
 from .forms import CommentForm
-from .models import Comment, News
+from .models import (
+    ArchivedComment, ArchivedNews, Comment, News, QueuedComment
+)
+from .pagination import (
+    aget_comment_page, get_comment_page, get_news_page
+)
+from .queue import enqueue_comment
+from .rankings import RANKINGS, ranked_news
+from .ratelimit import RateLimitMixin
+from .routers import read_primary
+from .search import search
+from .syndication import FORMATS, accepts_gzip, get_feed
 
 
+class CommentPageMixin:
+    """Добавляет в контекст первую страницу комментариев к новости."""
+
+    @property
+    def archived(self):
+        return isinstance(self.object, ArchivedNews)
+
+    @property
+    def comment_model(self):
+        return ArchivedComment if self.archived else Comment
+
+    def get_comment_page(self):
+        return get_comment_page(self.object.pk, model=self.comment_model)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['archived'] = self.archived
+        context.update(self.get_comment_page())
+        return context
+
+
+@method_decorator(
+    condition(
+        etag_func=news_list_etag,
+        last_modified_func=news_list_last_modified,
+    ),
+    name='get',
+)
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    # Поля, которые выводит шаблон: полный текст новости не нужен.
+    render_fields = ('title', 'date', 'excerpt', 'comment_count')
 
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Список
+        кешируется под версией главной страницы и в лентах, поэтому
+        читается с основной базы.
+        """
+        return read_primary(self.model.objects.only(
+            *self.render_fields
+        ))[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get_context_data(self, **kwargs):
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        Список новостей одинаков для всех пользователей и кешируется.
+
+        Шапка с именем пользователя лежит вне кешируемого фрагмента.
+        """
+        context = super().get_context_data(**kwargs)
+        context['home_version'] = get_home_version()
+        context['home_cache_timeout'] = settings.HOME_CACHE_TIMEOUT
+        return context
+
+
+class AsyncNewsList(NewsList):
+    """
+    Список новостей для ASGI.
+
+    Новости читаются асинхронным ORM и только если фрагмент
+    со списком ещё не закеширован. Если фрагмент пропадёт из кеша
+    между проверкой и отрисовкой, шаблон сам выполнит ленивый запрос:
+    отрисовка идёт в синхронном потоке.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        # ETag зависит от пользователя: загружаем его заранее.
+        request.user = await request.auser()
+        return await self.conditional_get(request, *args, **kwargs)
 
+    @method_decorator(condition(
+        etag_func=news_list_etag,
+        last_modified_func=news_list_last_modified,
+    ))
+    async def conditional_get(self, request, *args, **kwargs):
+        self.object_list = []
+        context = self.get_context_data()
+        if await self.fragment_cached(context):
+            context['object_list'] = self.get_queryset()
+        else:
+            context['object_list'] = [
+                news async for news in self.get_queryset().aiterator()
+            ]
+        return self.render_to_response(context)
 
-class NewsDetail(generic.DetailView):
+    async def fragment_cached(self, context):
+        fragment_key = make_template_fragment_key(
+            'home_news', [context['home_version']]
+        )
+        return await cache.aget(fragment_key) is not None
+
+
+class NewsDetail(CommentPageMixin, generic.DetailView):
+    """
+    Страница новости.
+
+    Новости, которой нет в основной таблице, ищется в архиве
+    (news.archive) и выводится без формы комментария.
+    """
     model = News
     template_name = 'news/detail.html'
+    context_object_name = 'news'
+    # Поля, которые выводит шаблон.
+    render_fields = ('title', 'text', 'date')
+
+    def get_queryset(self):
+        return self.model.objects.only(*self.render_fields)
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        try:
+            return self.get_queryset().get(pk=self.kwargs['pk'])
+        except self.model.DoesNotExist:
+            pass
+        obj = archived_news(self.kwargs['pk'], self.render_fields)
+        if obj is None:
+            raise Http404
         return obj
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
+        if self.request.user.is_authenticated and not self.archived:
             context['form'] = CommentForm()
+            if settings.COMMENT_WRITE_BEHIND:
+                # Свои комментарии из очереди автор видит сразу.
+                context['queued_comments'] = QueuedComment.objects.filter(
+                    news=self.object, author=self.request.user
+                )
         return context
 
 
+class AsyncNewsDetail(NewsDetail):
+    """Страница новости для ASGI: данные читаются асинхронным ORM."""
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs['pk'])
+        except self.model.DoesNotExist:
+            self.object = await aarchived_news(
+                self.kwargs['pk'], self.render_fields
+            )
+        if self.object is None:
+            raise Http404
+        self.comment_page = await aget_comment_page(
+            self.object.pk, model=self.comment_model
+        )
+        return self.render_to_response(
+            self.get_context_data(object=self.object)
+        )
+
+    def get_comment_page(self):
+        return self.comment_page
+
+
 class NewsComment(
+        RateLimitMixin,
         LoginRequiredMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -56,6 +208,11 @@ class NewsComment(
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        if settings.COMMENT_WRITE_BEHIND:
+            enqueue_comment(
+                self.object, self.request.user, form.cleaned_data['text']
+            )
+            return super().form_valid(form)
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
@@ -63,42 +220,223 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
+
+
+class NewsCommentList(generic.TemplateView):
+    """
+    Следующие страницы комментариев к новости.
+
+    Ссылка на следующую страницу архивной новости содержит
+    archived=1: комментарии читаются из архива.
+    """
+    template_name = 'news/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        archived = bool(self.request.GET.get('archived'))
+        context.update(news_id=self.kwargs['pk'], archived=archived)
+        context.update(get_comment_page(
+            self.kwargs['pk'],
+            self.request.GET.get('cursor'),
+            ArchivedComment if archived else Comment,
+        ))
+        return context
 
 
 class NewsDetailView(generic.View):
+    # Представления, которым передаются запросы к странице новости.
+    handler_views = {'get': NewsDetail, 'post': NewsComment}
 
+    @method_decorator(condition(
+        etag_func=news_detail_etag,
+        last_modified_func=news_detail_last_modified,
+    ))
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
+        view = self.handler_views['get'].as_view()
         return view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
+        view = self.handler_views['post'].as_view()
         return view(request, *args, **kwargs)
 
 
-class CommentBase(LoginRequiredMixin):
+class AsyncNewsDetailView(generic.View):
+    handler_views = {'get': AsyncNewsDetail, 'post': NewsComment}
+
+    async def get(self, request, *args, **kwargs):
+        # Всё, что нужно для ETag, загружаем асинхронно заранее.
+        request.user = await request.auser()
+        await aget_news_state(request, kwargs['pk'])
+        return await self.conditional_get(request, *args, **kwargs)
+
+    @method_decorator(condition(
+        etag_func=news_detail_etag,
+        last_modified_func=news_detail_last_modified,
+    ))
+    async def conditional_get(self, request, *args, **kwargs):
+        view = self.handler_views['get'].as_view()
+        return await view(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        view = sync_to_async(self.handler_views['post'].as_view())
+        return await view(request, *args, **kwargs)
+
+
+class CommentBase(RateLimitMixin, LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
+    # Поля комментария, которые нужны для обработки формы.
+    write_fields = ('news',)
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Страницам нужен заголовок новости, а при записи достаточно
+        полей из write_fields.
+        """
+        comments = self.model.objects.filter(author=self.request.user)
+        if self.request.method in ('GET', 'HEAD'):
+            return comments.select_related('news')
+        return comments.only(*self.write_fields)
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
     """Редактирование комментария."""
     template_name = 'news/edit.html'
     form_class = CommentForm
+    write_fields = ('news', 'text', 'text_html')
 
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+class NewsSearch(generic.TemplateView):
+    """Поиск по новостям и комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        try:
+            page = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        results, has_next = search(connection, query, page)
+        context.update(
+            query=query, page=page, results=results, has_next=has_next
+        )
+        return context
+
+
+class NewsRanking(generic.ListView):
+    """Рейтинг новостей, заранее построенный командой refresh_rankings."""
+    template_name = 'news/ranking.html'
+
+    def get_queryset(self):
+        if self.kwargs['ranking'] not in RANKINGS:
+            raise Http404
+        return ranked_news(self.kwargs['ranking'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['ranking_title'] = RANKINGS[self.kwargs['ranking']]
+        return context
+
+
+class NewsDates(generic.TemplateView):
+    """
+    Новости по годам, месяцам и дням.
+
+    Без даты - оглавление по годам. Числа новостей берутся из сводной
+    таблицы (news.dates), новости периода выводятся постранично
+    по курсору.
+    """
+    template_name = 'news/dates.html'
+    # Аргументы адреса страницы каждого уровня.
+    url_parts = {
+        'year': ('year',),
+        'month': ('year', 'month'),
+        'day': ('year', 'month', 'day'),
+    }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if 'year' not in self.kwargs:
+            context['periods'] = self.get_periods('year', child_counts())
+            context['period_format'] = PERIOD_FORMATS['year']
+            return context
+        try:
+            level, first, last = get_period(
+                self.kwargs['year'],
+                self.kwargs.get('month'),
+                self.kwargs.get('day'),
+            )
+        except (ValueError, OverflowError):
+            raise Http404
+        context.update(
+            period=first,
+            title_format=PERIOD_FORMATS[level],
+            total=period_total(first, last),
+        )
+        if level in CHILD_LEVELS:
+            child_level = CHILD_LEVELS[level]
+            context['periods'] = self.get_periods(
+                child_level, child_counts(level, first, last)
+            )
+            context['period_format'] = PERIOD_FORMATS[child_level]
+        news = News.objects.only(*NewsList.render_fields).filter(
+            date__range=(first, last)
+        )
+        context.update(get_news_page(news, self.request.GET.get('cursor')))
+        return context
+
+    def get_periods(self, level, counts):
+        return [
+            {
+                'date': day,
+                'count': count,
+                'url': reverse(f'news:dates_{level}', args=[
+                    getattr(day, part) for part in self.url_parts[level]
+                ]),
+            }
+            for day, count in counts
+        ]
+
+
+class NewsFeed(generic.View):
+    """
+    Ленты новостей для агрегаторов: RSS, Atom и JSON Feed.
+
+    Новости те же, что на главной странице. Ответ отдаётся из готовой
+    ленты в кеше, сжатой заранее, если клиент принимает gzip.
+    """
+
+    def get(self, request, format):
+        if format not in FORMATS:
+            raise Http404
+        feed = get_feed(request, format, NewsList().get_queryset())
+        response = get_conditional_response(request, etag=feed['etag'])
+        if response is None:
+            gzipped = accepts_gzip(
+                request.headers.get('Accept-Encoding', '')
+            )
+            response = HttpResponse(
+                feed['gzip'] if gzipped else feed['body'],
+                content_type=feed['content_type'],
+            )
+            if gzipped:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = feed['etag']
+        response['Vary'] = 'Accept-Encoding'
+        return response
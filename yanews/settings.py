@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.middleware.RequestMetricsMiddleware',
+    'news.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -28,6 +31,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'news.middleware.NewsSnapshotMiddleware',
 ]
 
 ROOT_URLCONF = 'yanews.urls'
@@ -36,7 +40,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -44,6 +47,15 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Разобранные шаблоны кешируются в процессе и при DEBUG;
+            # runserver сбрасывает кеш при изменении файлов шаблонов.
+            # wsgi.py и asgi.py прогревают кеш при запуске.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -58,6 +70,42 @@ DATABASES = {
     }
 }
 
+# Профиль SQLite для продакшена, включается переменной окружения
+# SQLITE_PRODUCTION=1. WAL не блокирует чтение записью, IMMEDIATE-
+# транзакции и таймаут заставляют писателей ждать очереди вместо
+# ошибки "database is locked", соединения живут между запросами.
+SQLITE_PRODUCTION = {
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'timeout': 20,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA mmap_size=268435456;'
+            'PRAGMA cache_size=-65536;'
+        ),
+    },
+}
+if os.environ.get('SQLITE_PRODUCTION') == '1':
+    DATABASES['default'].update(SQLITE_PRODUCTION)
+
+DATABASE_ROUTERS = ['news.routers.ReplicaRouter']
+# Псевдонимы реплик из DATABASES, с которых читаются новости.
+DATABASE_REPLICAS = []
+# Сколько секунд после записи клиент читает с основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Подходит и файловый кеш:
+# 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+# 'LOCATION': BASE_DIR / 'cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +128,62 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+# Размер страницы навигации по датам (news.dates).
+NEWS_COUNT_ON_DATE_PAGE = 20
+
+# Сколько новостей в каждом рейтинге (news.rankings).
+RANKING_NEWS_COUNT = 10
+
+# Новости старше стольких дней команда archive_news переносит
+# в архивные таблицы (news.archive).
+NEWS_ARCHIVE_AFTER_DAYS = 365
+
+COMMENTS_COUNT_ON_PAGE = 50
+
+HOME_CACHE_TIMEOUT = 60 * 60
+
+# Готовые ленты живут в кеше до записи новостей, но не дольше суток.
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+SEARCH_RESULTS_ON_PAGE = 20
+# Сколько самых свежих совпадений в каждой таблице ранжировать по BM25.
+SEARCH_RANK_LIMIT = 10_000
+
+BAD_WORDS_MATCHER = 'news.moderation.RegexMatcher'
+# Файл с дополнительными запрещёнными словами, по одному на строку.
+BAD_WORDS_FILE = None
+
+# Асинхронные версии NewsList и NewsDetailView для запуска под ASGI.
+NEWS_ASYNC_VIEWS = False
+
+# Отложенная запись комментариев: страница новости кладёт их в очередь,
+# а команда flush_comment_queue переносит очередь пачками.
+COMMENT_WRITE_BEHIND = False
+COMMENT_QUEUE_BATCH_SIZE = 500
+
+# Не больше 10 записей комментариев за 60 секунд с одного IP и от одного
+# пользователя; None отключает ограничение.
+COMMENT_RATE_LIMIT = (10, 60)
+# Лимит по IP; за одним адресом без прокси могут быть многие клиенты.
+COMMENT_RATE_LIMIT_BY_IP = True
+
+# Сколько секунд имя автора комментария живёт в кеше процесса
+# (news.authors): смена имени в другом процессе видна не позже.
+DISPLAY_NAME_CACHE_TIMEOUT = 300
+
+# Сколько доверенных обратных прокси стоит перед сервером: адрес
+# клиента берётся из X-Forwarded-For (news.ratelimit.client_ip).
+# 0 - сервер принимает соединения напрямую, адрес - REMOTE_ADDR;
+# иначе клиент сам выбрал бы себе ведро лимита заголовком. За прокси
+# задайте число прокси в развёртывании, обычно 1.
+TRUSTED_PROXY_HOPS = 0
+
+# Каталог снимков страниц новостей для анонимных читателей, например
+# BASE_DIR / 'snapshots'; None отключает снимки (news.snapshots).
+NEWS_SNAPSHOT_ROOT = None
+
+# Токен для сбора метрик Prometheus с /metrics.
+METRICS_TOKEN = None
+# Пик памяти за запрос через tracemalloc: заметно замедляет сервер.
+METRICS_TRACE_MEMORY = False
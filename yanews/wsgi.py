@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
 application = get_wsgi_application()
+
+# Шаблоны разбираются при запуске процесса, а не на первых запросах.
+from news.template_cache import warm_template_cache  # noqa: E402
+
+warm_template_cache()